@@ -4,6 +4,10 @@ Simple Deepgram TTS test script
 Says "I like poop" using Deepgram's text-to-speech API
 """
 
+import asyncio
+import functools
+import hashlib
+import json
 import os
 import subprocess
 import sys
@@ -11,11 +15,25 @@ from pathlib import Path
 
 try:
     import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
 except ImportError:
     print("❌ Error: requests library not installed")
     print("   Install with: pip install requests")
     sys.exit(1)
 
+try:
+    import alsaaudio  # in-process ALSA playback (no aplay fork per phrase)
+except ImportError:
+    alsaaudio = None
+
+try:
+    import aiohttp  # async variant for use inside the agent's event loop
+    import aiofiles
+except ImportError:
+    aiohttp = None
+    aiofiles = None
+
 # Deepgram API configuration
 DEEPGRAM_API_KEY = os.getenv("DEEPGRAM_API_KEY")
 if not DEEPGRAM_API_KEY:
@@ -27,19 +45,145 @@ if not DEEPGRAM_API_KEY:
 # Text to speak
 TEXT = "I like poop"
 
+# Shared session so repeated calls reuse the same TCP+TLS connection
+# (saves a full handshake per phrase) instead of reconnecting every time
+SESSION = requests.Session()
+SESSION.headers.update({
+    "Authorization": f"Token {DEEPGRAM_API_KEY}",
+    "Content-Type": "application/json"
+})
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=10,
+    max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=[502, 503, 504])
+))
+
 # Deepgram TTS endpoint - model can be in URL or as query param
 DEEPGRAM_TTS_BASE = "https://api.deepgram.com/v1/speak"
 
+# Audio format requested from Deepgram
+SAMPLE_RATE = 24000
+
+# On-disk cache of synthesized audio so repeated phrases skip the API entirely
+CACHE_DIR = Path("~/.cache/deepgram_tts").expanduser()
+CACHE_MAX_ENTRIES = 500
+
+
+def _cache_path(text: str, model: str, params: dict) -> Path:
+    """Return the cache file path for a (text, model, params) combination."""
+    key = hashlib.sha256(
+        f"{model}|{text}|{json.dumps(params, sort_keys=True)}".encode()
+    ).hexdigest()
+    suffix = "pcm" if params.get("container") == "none" else "wav"
+    return CACHE_DIR / f"{key}.{suffix}"
+
+
+def _trim_cache():
+    """Drop the oldest cached files once the cache grows past CACHE_MAX_ENTRIES."""
+    cached = sorted(
+        (p for p in CACHE_DIR.iterdir() if p.suffix in (".wav", ".pcm")),
+        key=lambda p: p.stat().st_mtime
+    )
+    for old in cached[:-CACHE_MAX_ENTRIES]:
+        try:
+            old.unlink()
+        except OSError:
+            pass
+
+@functools.lru_cache(maxsize=1)
+def _get_pcm():
+    """Open the ALSA PCM device once and reuse it for every phrase.
+
+    Returns None when pyalsaaudio is unavailable or the device can't be
+    opened, in which case playback falls back to spawning aplay.
+    """
+    if alsaaudio is None:
+        return None
+    try:
+        card_index = _sound_card_index()
+        device = f"hw:{card_index},0" if card_index else "default"
+        pcm = alsaaudio.PCM(alsaaudio.PCM_PLAYBACK, device=device)
+        pcm.setchannels(1)
+        pcm.setrate(SAMPLE_RATE)
+        pcm.setformat(alsaaudio.PCM_FORMAT_S16_LE)
+        pcm.setperiodsize(1024)
+        print(f"   Using in-process ALSA playback on {device}")
+        return pcm
+    except Exception as e:
+        print(f"⚠️  Could not open ALSA PCM device: {e}")
+        return None
+
+
+def _play_pcm_file(pcm, audio_file: str) -> bool:
+    """Stream a raw PCM file into an already-open ALSA device."""
+    with open(audio_file, "rb") as f:
+        while chunk := f.read(2048):
+            pcm.write(chunk)
+    print("✅ Done!")
+    return True
+
+
+@functools.lru_cache(maxsize=1)
+def _sound_card_index():
+    """Find the wm8960soundcard index (common on Pi HATs), memoized.
+
+    Parses /proc/asound/cards in Python so we don't fork an awk process
+    on every call - the index never changes while the script runs.
+    """
+    try:
+        with open("/proc/asound/cards") as cards:
+            for line in cards:
+                if "wm8960soundcard" in line:
+                    return line.split()[0]
+    except OSError:
+        pass
+    return None
+
+
+def _aplay_command() -> list:
+    """Build the aplay command line for raw PCM, picking the right sound card.
+
+    We request container=none from Deepgram (raw linear16), so aplay gets
+    explicit format flags instead of parsing a WAV header. Raw PCM also
+    removes the WAV total-length-up-front constraint that blocks chunked
+    streaming.
+    """
+    # aplay's default buffering is hundreds of ms on a Pi, which audibly
+    # delays the first sample; a 20 ms period with a 100 ms buffer keeps
+    # startup latency low (bump these if `aplay -v` reports underruns)
+    cmd = [
+        "aplay", "-q", "-f", "S16_LE", "-r", str(SAMPLE_RATE), "-c", "1",
+        "--period-size=480", "--buffer-size=2400"
+    ]
+    card_index = _sound_card_index()
+
+    if card_index and card_index.isdigit():
+        print(f"   Using sound card: {card_index}")
+        return cmd + ["-D", f"hw:{card_index},0"]
+
+    # Use default audio device
+    print("   Using default audio device")
+    return cmd
+
+
+def _play_audio(audio_file: str) -> bool:
+    """Play a raw PCM file using aplay (Raspberry Pi default)."""
+    try:
+        subprocess.run(_aplay_command() + [audio_file], check=True)
+    except subprocess.CalledProcessError as e:
+        print(f"❌ Error playing audio: {e}")
+        print("   Audio file saved at:", audio_file)
+        print("   You can play it manually with: aplay", audio_file)
+        return False
+
+    print("✅ Done!")
+    return True
+
+
 def say_text(text: str):
     """Use Deepgram TTS to convert text to speech and play it."""
     print(f"🎤 Saying: '{text}'")
-    
-    # Prepare request
-    headers = {
-        "Authorization": f"Token {DEEPGRAM_API_KEY}",
-        "Content-Type": "application/json"
-    }
-    
+
     # Deepgram TTS request payload - only text in body (as per API requirement)
     payload = {
         "text": text
@@ -48,73 +192,78 @@ def say_text(text: str):
     # Model selection
     model = "aura-asteria-en"  # You can change this to other voices like "aura-luna-en", "aura-stella-en"
     
-    # Query parameters for audio settings (model might need to be in URL)
+    # Query parameters for audio settings (model might need to be in URL).
+    # Raw PCM (container=none) for both backends - the in-process ALSA
+    # device takes it directly and aplay gets explicit format flags.
+    pcm = _get_pcm()
     params = {
         "encoding": "linear16",
-        "container": "wav",
-        "sample_rate": 24000
+        "container": "none",
+        "sample_rate": SAMPLE_RATE
     }
-    
+
+    # Check the on-disk cache first - repeated phrases skip the API entirely
+    cache_path = _cache_path(text, model, params)
+    if cache_path.exists():
+        print(f"✅ Cache hit, playing {cache_path}")
+        if pcm is not None:
+            return _play_pcm_file(pcm, str(cache_path))
+        return _play_audio(str(cache_path))
+
     # Try with model in URL path first
     url = f"{DEEPGRAM_TTS_BASE}/{model}"
-    
+
     print("📡 Sending request to Deepgram...")
     print(f"   URL: {url}")
     print(f"   Params: {params}")
     print(f"   Body: {payload}")
     try:
-        # Make API request - text in JSON body, model in URL, settings as query params
-        response = requests.post(
+        # Make API request - text in JSON body, model in URL, settings as query params.
+        # stream=True lets us start playback on the first chunk instead of
+        # waiting for the full synthesis to finish.
+        with SESSION.post(
             url,
-            headers=headers,
             json=payload,
             params=params,
-            timeout=10
-        )
-        
-        if response.status_code != 200:
-            print(f"❌ Error: Deepgram API returned status {response.status_code}")
-            print(f"   Response: {response.text}")
-            return False
-        
-        # Save audio to temporary file
-        audio_file = "/tmp/deepgram_tts.wav"
-        with open(audio_file, "wb") as f:
-            f.write(response.content)
-        
-        print(f"✅ Audio received, saved to {audio_file}")
-        print("🔊 Playing audio...")
-        
-        # Play audio using aplay (Raspberry Pi default)
-        # Try to find the correct sound card
-        try:
-            # Check for wm8960soundcard (common on Pi HATs)
-            result = subprocess.run(
-                ["awk", "/wm8960soundcard/ {print $1}", "/proc/asound/cards"],
-                capture_output=True,
-                text=True
-            )
-            card_index = result.stdout.strip().split('\n')[0] if result.stdout.strip() else None
-            
-            if card_index and card_index.isdigit():
-                print(f"   Using sound card: {card_index}")
-                subprocess.run(
-                    ["aplay", "-D", f"hw:{card_index},0", audio_file],
-                    check=True
-                )
+            timeout=10,
+            stream=True
+        ) as response:
+            if response.status_code != 200:
+                print(f"❌ Error: Deepgram API returned status {response.status_code}")
+                print(f"   Response: {response.text}")
+                return False
+
+            # Stream audio out as it arrives (play-while-receiving),
+            # collecting the chunks so we can cache the full clip afterwards
+            chunks = []
+            if pcm is not None:
+                print("🔊 Streaming audio to ALSA...")
+                for chunk in response.iter_content(chunk_size=2048):
+                    pcm.write(chunk)
+                    chunks.append(chunk)
             else:
-                # Use default audio device
-                print("   Using default audio device")
-                subprocess.run(["aplay", audio_file], check=True)
-        except subprocess.CalledProcessError as e:
-            print(f"❌ Error playing audio: {e}")
-            print("   Audio file saved at:", audio_file)
-            print("   You can play it manually with: aplay", audio_file)
-            return False
-        
+                print("🔊 Streaming audio to aplay...")
+                player = subprocess.Popen(_aplay_command() + ["-"], stdin=subprocess.PIPE)
+                try:
+                    for chunk in response.iter_content(chunk_size=4096):
+                        player.stdin.write(chunk)
+                        chunks.append(chunk)
+                finally:
+                    # Close stdin so aplay drains its buffer and exits
+                    player.stdin.close()
+                    player.wait()
+
+        # Save audio to the cache (write to a temp file, then atomic rename)
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix(".tmp")
+        tmp_path.write_bytes(b"".join(chunks))
+        os.replace(tmp_path, cache_path)
+        _trim_cache()
+
+        print(f"✅ Audio cached at {cache_path}")
         print("✅ Done!")
         return True
-        
+
     except requests.exceptions.RequestException as e:
         print(f"❌ Error making request to Deepgram: {e}")
         return False
@@ -125,6 +274,56 @@ def say_text(text: str):
         return False
 
 
+async def say_text_async(text: str):
+    """Async counterpart of say_text for use inside an event loop.
+
+    Blocking requests.post + file writes would stall the agent's whole
+    asyncio loop for the duration of the synthesis; this variant streams
+    the download with aiohttp, writes via aiofiles and plays through an
+    asyncio subprocess.
+    """
+    if aiohttp is None or aiofiles is None:
+        raise RuntimeError(
+            "say_text_async requires aiohttp and aiofiles "
+            "(pip install aiohttp aiofiles)"
+        )
+
+    print(f"🎤 Saying (async): '{text}'")
+
+    payload = {"text": text}
+    model = "aura-asteria-en"
+    params = {
+        "encoding": "linear16",
+        "container": "none",
+        "sample_rate": SAMPLE_RATE
+    }
+    url = f"{DEEPGRAM_TTS_BASE}/{model}"
+
+    cache_path = _cache_path(text, model, params)
+    if cache_path.exists():
+        print(f"✅ Cache hit, playing {cache_path}")
+    else:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix(".tmp")
+        async with aiohttp.ClientSession(headers=dict(SESSION.headers)) as session:
+            async with session.post(url, json=payload, params=params) as response:
+                if response.status != 200:
+                    print(f"❌ Error: Deepgram API returned status {response.status}")
+                    return False
+                async with aiofiles.open(tmp_path, "wb") as f:
+                    async for chunk in response.content.iter_chunked(4096):
+                        await f.write(chunk)
+        os.replace(tmp_path, cache_path)
+        _trim_cache()
+
+    player = await asyncio.create_subprocess_exec(
+        *_aplay_command(), str(cache_path)
+    )
+    await player.wait()
+    print("✅ Done!")
+    return player.returncode == 0
+
+
 if __name__ == "__main__":
     print("=" * 50)
     print("Deepgram TTS Test")
@@ -5,13 +5,21 @@ This script demonstrates how to use the GROK voice agent API through LiveKit Age
 
 import os
 import asyncio
+import functools
+import random
+import time
+from collections import defaultdict
+from datetime import timedelta
+from pathlib import Path
 from dotenv import load_dotenv
 from livekit.agents import AgentServer, AgentSession, Agent
-from livekit.plugins import xai
 from livekit import api, rtc
 
-# Load environment variables from .env file
-load_dotenv()
+# Load environment variables from .env file (guarded so a re-import of
+# this module - e.g. via the CLI console branch - doesn't re-parse .env)
+if not os.environ.get("_DOTENV_LOADED"):
+    load_dotenv()
+    os.environ["_DOTENV_LOADED"] = "1"
 
 class GrokAssistant(Agent):
     """
@@ -36,6 +44,36 @@ livekit_url = os.getenv("LIVEKIT_URL", "ws://localhost:7880")
 livekit_key = os.getenv("LIVEKIT_API_KEY", "devkey")
 livekit_secret = os.getenv("LIVEKIT_API_SECRET", "secret")
 room_name = os.getenv("LIVEKIT_ROOM", "test-room")
+xai_api_key = os.getenv("XAI_API_KEY")
+
+
+def _require_xai_api_key():
+    """Fail fast if the xAI key is missing (resolved once at import)."""
+    if not xai_api_key:
+        raise ValueError(
+            "XAI_API_KEY environment variable is not set. "
+            "Please set it in your .env file or environment."
+        )
+
+
+@functools.lru_cache(maxsize=32)
+def _agent_jwt(room_name: str, hour_bucket: int) -> str:
+    """Build (and cache) the agent's signed JWT for a room.
+
+    JWT signing involves HMAC work we don't need to repeat on every
+    reconnect; the hour_bucket argument rotates the cache entry well
+    before the 6-hour token TTL expires.
+    """
+    return api.AccessToken(livekit_key, livekit_secret) \
+        .with_identity("grokie-agent") \
+        .with_name("Grokie") \
+        .with_ttl(timedelta(hours=6)) \
+        .with_grants(api.VideoGrants(
+            room_join=True,
+            room=room_name,
+            can_publish=True,
+            can_subscribe=True,
+        )).to_jwt()
 
 server = AgentServer(
     ws_url=livekit_url,
@@ -43,8 +81,85 @@ server = AgentServer(
     api_secret=livekit_secret,
 )
 
-# Track active sessions to avoid duplicates
-active_sessions = {}
+# Track active sessions to avoid duplicates. The check-then-add is done
+# under a per-room asyncio.Lock: the rtc_session handler and auto_join_room
+# can race, and two coroutines passing a bare membership check would start
+# duplicate agent sessions (double LLM cost, overlapping TTS).
+_room_locks = defaultdict(asyncio.Lock)
+_active_rooms = set()
+
+# Pre-synthesized greeting audio. The connect greeting is a fixed prompt
+# producing near-identical output every session, so paying a full LLM+TTS
+# round trip per connect is wasted; drop mono 24 kHz S16_LE PCM files named
+# greeting_*.pcm in this directory and one is streamed at random instead.
+GREETING_CACHE_DIR = Path("~/.cache/grokie").expanduser()
+GREETING_SAMPLE_RATE = 24000
+
+
+# One pre-built RealtimeModel kept warm so a button press doesn't pay the
+# xAI WSS handshake (TLS + auth + model init) before the first audio
+_warm_model = None
+
+
+async def _replenish_warm_model():
+    """Build the next warm RealtimeModel in the background."""
+    global _warm_model
+    from livekit.plugins import xai
+
+    model = xai.realtime.RealtimeModel()
+    # Pre-open the upstream connection when the plugin exposes a primitive
+    # for it; otherwise at least the model/plugin init cost is prepaid
+    connect = getattr(model, "aconnect", None)
+    if connect is not None:
+        try:
+            await connect()
+        except Exception as e:
+            print(f"⚠️  Could not pre-connect warm model: {e}")
+    _warm_model = model
+
+
+def _take_warm_model():
+    """Hand out the warm model (if any), leaving the slot empty."""
+    global _warm_model
+    model = _warm_model
+    _warm_model = None
+    return model
+
+
+async def _play_cached_greeting(room: rtc.Room) -> bool:
+    """Stream a cached greeting into the room; False if none is cached."""
+    try:
+        variants = sorted(GREETING_CACHE_DIR.glob("greeting_*.pcm"))
+    except OSError:
+        return False
+    if not variants:
+        return False
+
+    # Rotate between a few pre-generated variants to avoid staleness
+    pcm_path = random.choice(variants)
+    data = pcm_path.read_bytes()
+
+    source = rtc.AudioSource(GREETING_SAMPLE_RATE, 1)
+    track = rtc.LocalAudioTrack.create_audio_track("grokie-greeting", source)
+    publication = await room.local_participant.publish_track(
+        track, rtc.TrackPublishOptions()
+    )
+
+    # Feed the PCM in 20 ms frames
+    samples_per_frame = GREETING_SAMPLE_RATE // 50
+    frame_bytes = samples_per_frame * 2
+    try:
+        for offset in range(0, len(data) - frame_bytes + 1, frame_bytes):
+            frame = rtc.AudioFrame(
+                data=data[offset:offset + frame_bytes],
+                sample_rate=GREETING_SAMPLE_RATE,
+                num_channels=1,
+                samples_per_channel=samples_per_frame,
+            )
+            await source.capture_frame(frame)
+    finally:
+        await room.local_participant.unpublish_track(publication.sid)
+    return True
 
 
 async def start_agent_session(room: rtc.Room):
@@ -53,30 +168,32 @@ async def start_agent_session(room: rtc.Room):
     This is called when a client connects to trigger the agent to join.
     """
     # Check if API key is set
-    api_key = os.getenv("XAI_API_KEY")
-    if not api_key:
-        raise ValueError(
-            "XAI_API_KEY environment variable is not set. "
-            "Please set it in your .env file or environment."
-        )
-    
-    # Avoid duplicate sessions for the same room
-    if room.name in active_sessions:
-        print(f"⚠️  Agent session already active for room: {room.name}")
-        return
-    
+    _require_xai_api_key()
+
+    # Avoid duplicate sessions for the same room (atomic under the lock)
+    async with _room_locks[room.name]:
+        if room.name in _active_rooms:
+            print(f"⚠️  Agent session already active for room: {room.name}")
+            return
+        _active_rooms.add(room.name)
+
     print(f"\n🎤 Client connected to room: {room.name}, starting agent session...")
-    active_sessions[room.name] = True
     
     try:
-        # Initialize the session with Grok realtime model
+        # The xai plugin pulls in large protobuf/gRPC modules, so import it
+        # lazily - server startup doesn't need to pay for it
+        from livekit.plugins import xai
+
+        # Initialize the session with Grok realtime model, preferring the
+        # pre-warmed instance so the session skips the WSS handshake.
         # You can customize the voice by passing voice parameter:
         # Available voices: 'Ara', 'Rex', 'Sal', 'Eve', 'Leo'
-        session = AgentSession(
-            llm=xai.realtime.RealtimeModel(
+        model = _take_warm_model()
+        if model is None:
+            model = xai.realtime.RealtimeModel(
                 # voice='Ara',  # Uncomment to specify a voice
-            ),
-        )
+            )
+        session = AgentSession(llm=model)
         
         # Start the session with the GrokAssistant agent
         await session.start(room=room, agent=GrokAssistant())
@@ -84,13 +201,17 @@ async def start_agent_session(room: rtc.Room):
         print("✅ Agent session started")
         print("   💡 Agent is ready to receive audio and respond")
         
-        # Generate an initial greeting
+        # Generate an initial greeting (cached audio when available, so a
+        # connect doesn't pay an LLM+TTS round trip for a fixed prompt)
         print("💬 Generating initial greeting...")
         try:
-            await session.generate_reply(
-                instructions="Greet the user as Grokie with a funny, quick-witted one-liner. Keep it to 1-2 sentences."
-            )
-            print("✅ Initial greeting sent")
+            if await _play_cached_greeting(room):
+                print("✅ Cached greeting played")
+            else:
+                await session.generate_reply(
+                    instructions="Greet the user as Grokie with a funny, quick-witted one-liner. Keep it to 1-2 sentences."
+                )
+                print("✅ Initial greeting sent")
         except Exception as e:
             print(f"⚠️  Error generating greeting: {e}")
             import traceback
@@ -108,8 +229,10 @@ async def start_agent_session(room: rtc.Room):
         traceback.print_exc()
     finally:
         # Remove from active sessions when done
-        if room.name in active_sessions:
-            del active_sessions[room.name]
+        _active_rooms.discard(room.name)
+        _room_locks.pop(room.name, None)
+        # Rebuild the warm model for the next session off the hot path
+        asyncio.create_task(_replenish_warm_model())
         print(f"👋 Agent session ended for room: {room.name}")
 
 
@@ -128,7 +251,7 @@ async def auto_join_room(room_name: str):
     This is a simpler approach that connects directly to a known room.
     """
     # Skip if we already have an active session for this room
-    if room_name in active_sessions:
+    if room_name in _active_rooms:
         print(f"⚠️  Agent session already active for room: {room_name}")
         return
     
@@ -137,20 +260,12 @@ async def auto_join_room(room_name: str):
     try:
         # Create a room connection
         room = rtc.Room()
-        
-        # Generate token for agent to join
-        token = api.AccessToken(livekit_key, livekit_secret) \
-            .with_identity("grokie-agent") \
-            .with_name("Grokie") \
-            .with_grants(api.VideoGrants(
-                room_join=True,
-                room=room_name,
-                can_publish=True,
-                can_subscribe=True,
-            ))
-        
+
+        # Generate token for agent to join (cached per room + hour bucket)
+        token = _agent_jwt(room_name, int(time.time()) // 3600)
+
         # Connect to the room
-        await room.connect(livekit_url, token.to_jwt())
+        await room.connect(livekit_url, token)
         print(f"✅ Agent connected to room: {room_name}")
         print(f"   Waiting for clients to join...")
         
@@ -167,8 +282,7 @@ async def auto_join_room(room_name: str):
         print(f"❌ Error auto-joining room {room_name}: {e}")
         import traceback
         traceback.print_exc()
-        if room_name in active_sessions:
-            del active_sessions[room_name]
+        _active_rooms.discard(room_name)
 
 
 async def main():
@@ -176,19 +290,12 @@ async def main():
     Main entry point for the voice agent server.
     """
     # Check if API key is set
-    api_key = os.getenv("XAI_API_KEY")
-    if not api_key:
-        raise ValueError(
-            "XAI_API_KEY environment variable is not set. "
-            "Please set it in your .env file or environment."
-        )
-    
-    # Get LiveKit configuration
-    livekit_url = os.getenv("LIVEKIT_URL", "ws://localhost:7880")
-    livekit_key = os.getenv("LIVEKIT_API_KEY", "devkey")
-    livekit_secret = os.getenv("LIVEKIT_API_SECRET", "secret")
-    default_room = os.getenv("LIVEKIT_ROOM", "test-room")
-    
+    _require_xai_api_key()
+
+    # LiveKit configuration is resolved once at module import
+    default_room = room_name
+
+
     print("Starting GROK Voice Agent Server...")
     print(f"LiveKit URL: {livekit_url}")
     print(f"LiveKit API Key: {livekit_key}")
@@ -198,6 +305,12 @@ async def main():
     print("\n💡 The agent will auto-join the room when clients connect.")
     print("   You can also use the @server.rtc_session() handler for explicit requests.\n")
     
+    # Pre-warm the realtime model before the first client connects
+    try:
+        await _replenish_warm_model()
+    except Exception as e:
+        print(f"⚠️  Could not pre-warm realtime model: {e}")
+
     # Start auto-join task in background (connects to default room)
     auto_join_task = asyncio.create_task(auto_join_room(default_room))
     
@@ -5,29 +5,90 @@ Monitors button presses and toggles the GROK voice connection on/off.
 
 import RPi.GPIO as GPIO
 import subprocess
+import select
 import signal
 import os
 import sys
+import threading
 import time
+from datetime import timedelta
 from pathlib import Path
 
+try:
+    # Preferred backend: DMA-sampled, hardware-timestamped edge events
+    # (~50 µs latency vs ~500 µs for RPi.GPIO's thread callbacks)
+    import pigpio
+except ImportError:
+    pigpio = None
+
+try:
+    # Alternative to the 50 ms polling fallback: block on the gpiochip
+    # character device so the process sleeps at 0% CPU between edges
+    import gpiod
+    from gpiod.edge_event import EdgeEvent
+    from gpiod.line import Bias, Edge
+except ImportError:
+    gpiod = None
+
+GPIOCHIP = "/dev/gpiochip0"
+
 # Button pin (same as whisplay project)
-BUTTON_PIN = 11
+BUTTON_PIN = 11       # BOARD numbering (RPi.GPIO)
+BUTTON_PIN_BCM = 17   # The same physical pin in BCM numbering (pigpio)
 
 # Global state
 grok_process = None
+warm_process = None  # Pre-spawned client waiting for START on stdin
 is_connected = False
+is_stopping = False  # True while stop_grok_connection is tearing down the child
 use_polling = False  # Fallback to polling if event detection fails
 last_button_state = None  # Will be initialized after GPIO setup
 
+# Set when it's time to exit; the main thread parks on this instead of
+# waking up every second just to poll the child process
+SHUTDOWN = threading.Event()
+
 # Get the directory of this script
 SCRIPT_DIR = Path(__file__).parent.absolute()
 CLIENT_SCRIPT = SCRIPT_DIR / "raspberry-pi-client" / "grok_pi_client.py"
 
+# Client output goes to a log file instead of an undrained PIPE - a full
+# pipe buffer (~64KB) would block the client's writes and hang the audio
+CLIENT_LOG = Path("/tmp/grokie_client.log")
+
+
+def _open_client_log():
+    """Open the client log for appending (shared by both spawn paths)."""
+    return open(CLIENT_LOG, "ab", buffering=64 * 1024)
+
+
+def _read_client_log_tail(max_bytes=4096):
+    """Return the last chunk of the client log for error reporting."""
+    try:
+        with open(CLIENT_LOG, "rb") as log:
+            log.seek(0, os.SEEK_END)
+            size = log.tell()
+            log.seek(max(0, size - max_bytes))
+            return log.read().decode('utf-8', errors='ignore')
+    except OSError:
+        return ""
+
 
 def cleanup():
     """Clean up GPIO and terminate any running processes."""
-    global grok_process
+    global grok_process, warm_process
+    if warm_process:
+        try:
+            # Closing stdin makes the warm client exit its START wait
+            warm_process.stdin.close()
+            warm_process.terminate()
+            warm_process.wait(timeout=2)
+        except Exception:
+            try:
+                warm_process.kill()
+            except Exception:
+                pass
+        warm_process = None
     if grok_process:
         try:
             print("Terminating GROK connection...")
@@ -41,6 +102,18 @@ def cleanup():
             print(f"Error terminating process: {e}")
         grok_process = None
     
+    # Tear down the pigpio backend if it's the one in use
+    global _pigpio, _pigpio_cb
+    if _pigpio is not None:
+        try:
+            if _pigpio_cb is not None:
+                _pigpio_cb.cancel()
+            _pigpio.stop()
+        except Exception:
+            pass
+        _pigpio = None
+        _pigpio_cb = None
+
     # Remove event detection before cleanup (matching whisplay pattern)
     try:
         GPIO.remove_event_detect(BUTTON_PIN)
@@ -57,44 +130,162 @@ def cleanup():
     print("Cleanup complete.")
 
 
+class SpawnedClient:
+    """Minimal Popen-alike for clients started via os.posix_spawn.
+
+    subprocess.Popen with preexec_fn=os.setsid forces CPython onto the
+    full fork() path, which copies the parent's page tables - tens to
+    hundreds of ms on a Pi with a large RSS. posix_spawn with setsid=True
+    gets the same new-session behaviour without the copy.
+    """
+
+    def __init__(self, script_args, stdin_pipe=False):
+        self.stdin = None
+        self.returncode = None
+
+        log = _open_client_log()
+        file_actions = []
+        stdin_read_fd = None
+        if stdin_pipe:
+            stdin_read_fd, stdin_write_fd = os.pipe()
+            file_actions.append((os.POSIX_SPAWN_DUP2, stdin_read_fd, 0))
+            self.stdin = os.fdopen(stdin_write_fd, "wb")
+        file_actions.append((os.POSIX_SPAWN_DUP2, log.fileno(), 1))
+        file_actions.append((os.POSIX_SPAWN_DUP2, log.fileno(), 2))
+
+        try:
+            self.pid = os.posix_spawn(
+                sys.executable,
+                [sys.executable] + list(script_args),
+                os.environ,
+                file_actions=file_actions,
+                setsid=True,  # New session, like the old preexec_fn=os.setsid
+            )
+        finally:
+            if stdin_read_fd is not None:
+                os.close(stdin_read_fd)
+            log.close()
+
+        # A pidfd refers to this exact process, so signals sent through it
+        # can never hit a recycled PID, and the fd becomes readable on
+        # exit - no polling needed to wait for the child
+        try:
+            self.pidfd = os.pidfd_open(self.pid)
+        except OSError:
+            self.pidfd = None  # pre-5.3 kernel; fall back to pid-based calls
+
+    def _close_pidfd(self):
+        if self.pidfd is not None:
+            try:
+                os.close(self.pidfd)
+            except OSError:
+                pass
+            self.pidfd = None
+
+    def poll(self):
+        if self.returncode is None:
+            try:
+                pid, status = os.waitpid(self.pid, os.WNOHANG)
+            except ChildProcessError:
+                # Already reaped elsewhere
+                self.returncode = -1
+                self._close_pidfd()
+                return self.returncode
+            if pid == self.pid:
+                self.returncode = os.waitstatus_to_exitcode(status)
+                self._close_pidfd()
+        return self.returncode
+
+    def wait(self, timeout=None):
+        if self.returncode is not None:
+            return self.returncode
+        if self.pidfd is not None:
+            # Sleep on the pidfd until the process exits - wakes within
+            # microseconds of the exit instead of on the next poll tick
+            ready, _, _ = select.select([self.pidfd], [], [], timeout)
+            if not ready and self.poll() is None:
+                raise subprocess.TimeoutExpired(str(CLIENT_SCRIPT), timeout)
+            return self.poll()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.poll() is None:
+            if deadline is not None and time.monotonic() > deadline:
+                raise subprocess.TimeoutExpired(str(CLIENT_SCRIPT), timeout)
+            time.sleep(0.05)
+        return self.returncode
+
+    def _send_signal(self, sig):
+        if self.pidfd is not None:
+            try:
+                signal.pidfd_send_signal(self.pidfd, sig)
+                return
+            except OSError:
+                pass
+        os.kill(self.pid, sig)
+
+    def terminate(self):
+        self._send_signal(signal.SIGTERM)
+
+    def kill(self):
+        self._send_signal(signal.SIGKILL)
+
+
+def spawn_warm_client():
+    """Pre-spawn a client that does its imports, then waits for START.
+
+    Python startup plus the livekit imports take multiple seconds on a Pi;
+    paying that cost ahead of time means a button press only has to write
+    one line to the child's stdin.
+    """
+    global warm_process
+
+    if warm_process is not None and warm_process.poll() is None:
+        return
+
+    try:
+        warm_process = SpawnedClient(
+            [str(CLIENT_SCRIPT), "--wait-for-start"],
+            stdin_pipe=True,  # Control pipe for the START command
+        )
+        print(f"🔥 Warm client spawned (PID: {warm_process.pid})")
+    except Exception as e:
+        print(f"⚠️  Could not pre-spawn warm client: {e}")
+        warm_process = None
+
+
 def start_grok_connection():
     """Start the GROK voice connection."""
-    global grok_process, is_connected
-    
+    global grok_process, warm_process, is_connected
+
     if is_connected:
         print("Already connected to GROK.")
         return
-    
+
     print("Starting GROK voice connection...")
     try:
-        # Start the client script
-        # Use subprocess.PIPE for stderr so we can capture errors
-        # But let stdout go to terminal so we can see real-time output
-        grok_process = subprocess.Popen(
-            [sys.executable, str(CLIENT_SCRIPT)],
-            cwd=str(SCRIPT_DIR),
-            stdout=None,  # Let stdout go to terminal
-            stderr=subprocess.PIPE,  # Capture stderr for error reporting
-            preexec_fn=os.setsid  # Create new process group
-        )
+        if warm_process is not None and warm_process.poll() is None:
+            # Fast path: wake the pre-spawned client - its imports and
+            # token work are already done, so it connects immediately
+            grok_process = warm_process
+            warm_process = None
+            grok_process.stdin.write(b"START\n")
+            grok_process.stdin.flush()
+        else:
+            # Cold path: no warm client available, start one from scratch
+            grok_process = SpawnedClient([str(CLIENT_SCRIPT)])
         is_connected = True
         print("✅ GROK connection started! (PID: {})".format(grok_process.pid))
-        print("   Watch the output above for connection status and errors.")
-        
+        print(f"   Client output is logged to {CLIENT_LOG}")
+
         # Give it a moment to start, then check if it's still alive
         time.sleep(0.5)
         if grok_process.poll() is not None:
             # Process died immediately
             exit_code = grok_process.returncode
             print(f"❌ GROK connection failed immediately (exit code: {exit_code})")
-            if grok_process.stderr:
-                try:
-                    stderr_output = grok_process.stderr.read().decode('utf-8', errors='ignore')
-                    if stderr_output:
-                        print("\n❌ Error output:")
-                        print(stderr_output)
-                except:
-                    pass
+            log_tail = _read_client_log_tail()
+            if log_tail:
+                print("\n❌ Error output:")
+                print(log_tail)
             is_connected = False
             grok_process = None
             return
@@ -106,30 +297,78 @@ def start_grok_connection():
         grok_process = None
 
 
+def _check_child_exit():
+    """Report and clean up after the client process dying unexpectedly.
+
+    Called from the SIGCHLD handler (event mode) and the polling loop, so
+    child death is noticed immediately instead of on the next 1 s wakeup.
+    """
+    global grok_process, is_connected
+
+    if is_stopping or grok_process is None or grok_process.poll() is None:
+        return
+
+    exit_code = grok_process.returncode
+    print(f"\n⚠️  GROK connection process ended unexpectedly (exit code: {exit_code})")
+
+    # Show the tail of the client log to explain the exit
+    log_tail = _read_client_log_tail()
+    if log_tail:
+        print("\n❌ Recent output from GROK client:")
+        print("=" * 50)
+        print(log_tail)
+        print("=" * 50)
+
+    grok_process = None
+    is_connected = False
+    print("\n💡 You can press the button again to retry the connection.")
+
+
 def stop_grok_connection():
     """Stop the GROK voice connection."""
-    global grok_process, is_connected
-    
+    global grok_process, warm_process, is_connected, is_stopping
+
     if not is_connected or grok_process is None:
         print("Not connected to GROK.")
         return
-    
+
     print("Stopping GROK voice connection...")
+    is_stopping = True
     try:
-        # Terminate the process group
-        os.killpg(os.getpgid(grok_process.pid), signal.SIGTERM)
-        grok_process.wait(timeout=5)
-        print("✅ GROK connection stopped!")
-    except subprocess.TimeoutExpired:
-        print("Force killing GROK connection...")
-        os.killpg(os.getpgid(grok_process.pid), signal.SIGKILL)
-        grok_process.wait()
-        print("✅ GROK connection force stopped!")
-    except Exception as e:
-        print(f"❌ Error stopping GROK connection: {e}")
-    finally:
+        # Fast path: a client with a control pipe disconnects on STOP and
+        # parks waiting for the next START, so recycle it as the warm
+        # client - no teardown, no re-import, no respawn
+        if grok_process.stdin is not None and grok_process.poll() is None:
+            try:
+                grok_process.stdin.write(b"STOP\n")
+                grok_process.stdin.flush()
+                warm_process = grok_process
+                grok_process = None
+                is_connected = False
+                print("✅ GROK connection stopped! (client kept warm)")
+                return
+            except Exception as e:
+                print(f"⚠️  Could not send STOP ({e}); terminating instead")
+
+        try:
+            # Terminate the process group
+            os.killpg(os.getpgid(grok_process.pid), signal.SIGTERM)
+            grok_process.wait(timeout=5)
+            print("✅ GROK connection stopped!")
+        except subprocess.TimeoutExpired:
+            print("Force killing GROK connection...")
+            os.killpg(os.getpgid(grok_process.pid), signal.SIGKILL)
+            grok_process.wait()
+            print("✅ GROK connection force stopped!")
+        except Exception as e:
+            print(f"❌ Error stopping GROK connection: {e}")
         grok_process = None
         is_connected = False
+        # Get the next warm client ready for the following press, off the
+        # caller's thread so the stop itself returns immediately
+        threading.Thread(target=spawn_warm_client, daemon=True).start()
+    finally:
+        is_stopping = False
 
 
 def toggle_connection():
@@ -140,11 +379,74 @@ def toggle_connection():
         start_grok_connection()
 
 
+# pigpio backend state
+_pigpio = None
+_pigpio_cb = None
+_last_tick = None
+
+
+def _on_pigpio_edge(gpio, level, tick):
+    """pigpio falling-edge callback with tick-based debounce.
+
+    tick is the hardware timestamp in µs; comparing against the previous
+    edge replaces both the ISR sleep and the pin re-read - no blocking.
+    """
+    global _last_tick
+
+    if _last_tick is not None and pigpio.tickDiff(_last_tick, tick) < 300_000:
+        return
+    _last_tick = tick
+
+    # Confirm the button is genuinely held low for ~5 ms before toggling:
+    # the glitch filter stops sub-20 ms pulses, but an EMI burst that
+    # straddles the filter window can still fire the callback. Runs on
+    # pigpio's callback thread, so the sleeps block nothing else.
+    for _ in range(5):
+        if _pigpio.read(BUTTON_PIN_BCM) != 0:
+            return
+        time.sleep(0.001)
+
+    print("\n[Button Pressed] Toggling GROK connection...")
+    toggle_connection()
+
+
+def setup_button_pigpio():
+    """Set up the button via pigpio; returns False if unavailable."""
+    global _pigpio, _pigpio_cb
+
+    if pigpio is None:
+        return False
+
+    pi = pigpio.pi()
+    if not pi.connected:
+        # pigpiod isn't running; fall back to RPi.GPIO
+        return False
+
+    pi.set_mode(BUTTON_PIN_BCM, pigpio.INPUT)
+    pi.set_pull_up_down(BUTTON_PIN_BCM, pigpio.PUD_UP)
+    # Hardware-side glitch filter: edges shorter than 20 ms never reach us
+    pi.set_glitch_filter(BUTTON_PIN_BCM, 20000)
+    _pigpio_cb = pi.callback(BUTTON_PIN_BCM, pigpio.FALLING_EDGE, _on_pigpio_edge)
+    _pigpio = pi
+    return True
+
+
+# Timestamp of the last accepted press, for the monotonic debounce gate
+_last_press_ns = 0
+
+
 def button_press_event(channel):
     """Handle button press event (for interrupt-based detection)."""
-    # Small debounce delay
-    time.sleep(0.1)
-    
+    global _last_press_ns
+
+    # Debounce with a monotonic timestamp instead of sleeping in the GPIO
+    # callback thread - a sleep here blocks every other edge for its
+    # duration, while the timestamp check costs nanoseconds
+    now = time.monotonic_ns()
+    if now - _last_press_ns < 200_000_000:  # 200 ms
+        return
+    _last_press_ns = now
+
     # Check if button is actually pressed (LOW = pressed with pull-up)
     if GPIO.input(channel) == GPIO.LOW:
         print("\n[Button Pressed] Toggling GROK connection...")
@@ -154,6 +456,60 @@ def button_press_event(channel):
         pass
 
 
+def run_gpiod_event_loop():
+    """Wait for button edges on the gpiochip fd instead of polling.
+
+    Replaces the 50 ms wakeup loop: the kernel parks us until an edge
+    arrives. The 1 s wait timeout exists only so the child process still
+    gets checked periodically. Returns False if gpiod isn't usable so the
+    caller can fall back to polling.
+    """
+    if gpiod is None:
+        return False
+
+    try:
+        # debounce_period pushes debouncing into the kernel/driver: bounces
+        # are merged before user space is ever woken, so no software gate
+        # or sleep is needed and a clean press is reported within ~30 ms.
+        # Both edges are watched so a press is confirmed by its release -
+        # an edge-only falling watch can silently lose presses to bounces.
+        settings = gpiod.LineSettings(
+            edge_detection=Edge.BOTH,
+            bias=Bias.PULL_UP,
+            debounce_period=timedelta(milliseconds=30),
+        )
+        request = gpiod.request_lines(
+            GPIOCHIP,
+            consumer="grokie-button",
+            config={BUTTON_PIN_BCM: settings},
+        )
+    except Exception as e:
+        print(f"⚠️  gpiod setup failed: {e}")
+        return False
+
+    print("✅ Button events via gpiod edge wait (kernel-debounced)")
+    last_falling_ns = None
+    with request:
+        while not SHUTDOWN.is_set():
+            if not request.wait_edge_events(1.0):
+                _check_child_exit()
+                continue
+            for event in request.read_edge_events():
+                if event.event_type == EdgeEvent.Type.FALLING_EDGE:
+                    # Button went down; remember when
+                    last_falling_ns = event.timestamp_ns
+                    continue
+                # Rising edge: toggle only if the button was held for at
+                # least 20 ms - rejects EMI glitches without missing real
+                # presses
+                if (last_falling_ns is not None
+                        and event.timestamp_ns - last_falling_ns > 20_000_000):
+                    print("\n[Button Pressed] Toggling GROK connection...")
+                    toggle_connection()
+                last_falling_ns = None
+    return True
+
+
 def check_button_polling():
     """Check button state using polling (fallback method)."""
     global last_button_state
@@ -168,30 +524,28 @@ def check_button_polling():
     last_button_state = current_state
 
 
-def main():
-    """Main function to set up button monitoring."""
-    global grok_process, is_connected, use_polling, last_button_state
-    
-    print("=" * 50)
-    print("GROK Voice Agent - Button Toggle")
-    print("=" * 50)
-    print(f"Button pin: {BUTTON_PIN}")
-    print(f"Client script: {CLIENT_SCRIPT}")
-    print("=" * 50)
-    print("\nPress the button to toggle GROK connection on/off")
-    print("Press Ctrl+C to exit\n")
-    
+def setup_button_rpi_gpio():
+    """Set up the button via RPi.GPIO; returns True for interrupt mode,
+    False when it had to fall back to polling."""
+    global last_button_state
+
     # Set up GPIO mode first (matching whisplay's approach)
     GPIO.setmode(GPIO.BOARD)
     GPIO.setwarnings(False)
     
-    # Try to remove any existing event detection (must be done after setmode)
+    # Try to remove any leftover state from a crashed prior instance
+    # (must be done after setmode) - a stale event detector makes
+    # add_event_detect raise and costs a full restart otherwise
     try:
         GPIO.remove_event_detect(BUTTON_PIN)
         print("⚠️  Removed existing event detection on pin 11")
     except (RuntimeError, ValueError):
         # No existing event detection, that's fine
         pass
+    try:
+        GPIO.cleanup(BUTTON_PIN)
+    except Exception:
+        pass
     
     # Set up the button pin
     try:
@@ -207,54 +561,84 @@ def main():
     # Use FALLING edge to detect button press (HIGH to LOW)
     # Note: whisplay uses GPIO.BOTH with bouncetime=50, but we use FALLING with 300ms
     try:
-        GPIO.add_event_detect(
-            BUTTON_PIN,
-            GPIO.FALLING,
-            callback=button_press_event,
-            bouncetime=300  # 300ms debounce (whisplay uses 50ms)
-        )
+        try:
+            GPIO.add_event_detect(
+                BUTTON_PIN,
+                GPIO.FALLING,
+                callback=button_press_event,
+                bouncetime=300  # 300ms debounce (whisplay uses 50ms)
+            )
+        except RuntimeError:
+            # A stale detector can survive the cleanup above; clear it
+            # and retry once before falling back to polling
+            try:
+                GPIO.remove_event_detect(BUTTON_PIN)
+            except Exception:
+                pass
+            try:
+                GPIO.cleanup(BUTTON_PIN)
+            except Exception:
+                pass
+            GPIO.setup(BUTTON_PIN, GPIO.IN, pull_up_down=GPIO.PUD_UP)
+            GPIO.add_event_detect(
+                BUTTON_PIN,
+                GPIO.FALLING,
+                callback=button_press_event,
+                bouncetime=300
+            )
         print("✅ Button event detection set up successfully (interrupt mode)")
-        use_polling = False
+        return True
     except RuntimeError as e:
         print(f"⚠️  Event detection failed: {e}")
         print("   Falling back to polling mode (less efficient but more reliable)")
         print("   This is normal if another process is using GPIO.")
         # Initialize button state for polling
         last_button_state = GPIO.input(BUTTON_PIN)
-        use_polling = True
-    
+        return False
+
+
+def main():
+    """Main function to set up button monitoring."""
+    global grok_process, is_connected, use_polling
+
+    print("=" * 50)
+    print("GROK Voice Agent - Button Toggle")
+    print("=" * 50)
+    print(f"Button pin: {BUTTON_PIN}")
+    print(f"Client script: {CLIENT_SCRIPT}")
+    print("=" * 50)
+    print("\nPress the button to toggle GROK connection on/off")
+    print("Press Ctrl+C to exit\n")
+
+    # Prefer pigpio's DMA-timestamped events; fall back to RPi.GPIO
+    if setup_button_pigpio():
+        print("✅ Button event detection set up via pigpio (glitch-filtered)")
+        use_polling = False
+    else:
+        use_polling = not setup_button_rpi_gpio()
+
+    # Pre-spawn a warm client so the first press doesn't pay import cost
+    spawn_warm_client()
+
+    # Child deaths are delivered via SIGCHLD so the main thread doesn't
+    # have to wake up periodically just to poll the process
+    signal.signal(signal.SIGCHLD, lambda signum, frame: _check_child_exit())
+
     try:
-        # Keep the script running
-        while True:
-            if use_polling:
-                # Use polling mode (check button every 50ms)
-                check_button_polling()
-                time.sleep(0.05)
-            else:
-                # Event detection mode (just sleep)
-                time.sleep(1)
-            
-            # Check if process is still running
-            if grok_process and grok_process.poll() is not None:
-                exit_code = grok_process.returncode
-                print(f"\n⚠️  GROK connection process ended unexpectedly (exit code: {exit_code})")
-                
-                # Try to read stderr to show the error
-                if grok_process.stderr:
-                    try:
-                        stderr_output = grok_process.stderr.read().decode('utf-8', errors='ignore')
-                        if stderr_output:
-                            print("\n❌ Error output from GROK client:")
-                            print("=" * 50)
-                            print(stderr_output)
-                            print("=" * 50)
-                    except Exception as e:
-                        print(f"   (Could not read error output: {e})")
-                
-                grok_process = None
-                is_connected = False
-                print("\n💡 You can press the button again to retry the connection.")
-                
+        if use_polling:
+            # Try blocking on the gpiochip device first; poll every 50ms
+            # only if that's unavailable too
+            if not run_gpiod_event_loop():
+                while not SHUTDOWN.is_set():
+                    check_button_polling()
+                    time.sleep(0.05)
+                    _check_child_exit()
+        else:
+            # Event detection mode: button presses arrive on the GPIO
+            # callback thread and child exits via SIGCHLD, so just park
+            # here until shutdown - no periodic wakeups
+            SHUTDOWN.wait()
+
     except KeyboardInterrupt:
         print("\n\n🛑 Shutting down...")
     except Exception as e:
@@ -268,6 +652,7 @@ def main():
 
 def signal_handler(signum, frame):
     """Handle termination signals."""
+    SHUTDOWN.set()
     cleanup()
     sys.exit(0)
 
@@ -5,16 +5,66 @@ Simplified to match web client approach.
 """
 
 import asyncio
+import base64
+import collections
+import json
+import logging
 import os
+import signal
 import sys
 import subprocess
 import threading
-import queue
-from dotenv import load_dotenv
+import time
+import traceback
+from logging.handlers import QueueHandler, QueueListener
+from pathlib import Path
+from queue import SimpleQueue
 from livekit import rtc, api
 
-# Load environment variables
-load_dotenv()
+try:
+    # Direct in-process ALSA: removes the sox/aplay processes, their pipes
+    # and the extra userspace copies per audio chunk
+    import alsaaudio
+except ImportError:
+    alsaaudio = None
+
+try:
+    # Imported once here rather than inside the frame paths - a function-
+    # local import still pays a sys.modules lookup and takes the import
+    # lock each call. Only fallback paths need numpy, hence optional.
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    # libuv-backed event loop: every room callback and WebRTC socket read
+    # dispatches through C instead of the selector loop, which is a
+    # measurable win on the Pi's single busy core
+    import uvloop
+    uvloop.install()
+except ImportError:
+    pass
+
+# Load environment variables from the Grokie project .env. Parsed with a
+# few lines of stdlib instead of python-dotenv - importing dotenv and its
+# transitive modules costs real milliseconds on a Pi cold start, and the
+# client only needs KEY=VALUE lines. Existing environment wins.
+_ENV_FILE = Path(__file__).resolve().parent.parent / ".env"
+try:
+    with open(_ENV_FILE) as _env:
+        for _line in _env:
+            _line = _line.strip()
+            if not _line or _line.startswith("#") or "=" not in _line:
+                continue
+            _key, _, _value = _line.partition("=")
+            os.environ.setdefault(_key.strip(), _value.strip().strip("'\""))
+except OSError:
+    pass
+
+# Warm-start mode: do all the heavy imports and token work up front, then
+# block on stdin until the launcher says START (used by grokie_button_toggle
+# to hide interpreter + livekit import cost from the button press)
+WAIT_FOR_START = "--wait-for-start" in sys.argv
 
 # Configuration
 LIVEKIT_URL = os.getenv("LIVEKIT_URL", "ws://localhost:7880")
@@ -23,9 +73,91 @@ LIVEKIT_API_SECRET = os.getenv("LIVEKIT_API_SECRET", "secret")
 ROOM_NAME = os.getenv("LIVEKIT_ROOM", "test-room")
 PARTICIPANT_NAME = os.getenv("PARTICIPANT_NAME", "raspberry-pi")
 
+# Event handlers run on the event loop at exactly the moments that are
+# latency-critical, so their diagnostic chatter goes through logging - a
+# disabled level short-circuits before any formatting happens (set
+# LOG_LEVEL=DEBUG for full verbosity). Records are queued and written by
+# a background listener thread: emitting a line costs one queue put, and
+# the stdout write itself never blocks the loop.
+_log_queue = SimpleQueue()
+_log_handler = logging.StreamHandler()
+_log_handler.setFormatter(logging.Formatter("%(message)s"))
+_log_listener = QueueListener(_log_queue, _log_handler)
+_log_listener.start()
+logging.getLogger().addHandler(QueueHandler(_log_queue))
+log = logging.getLogger(__name__)
+log.setLevel(os.getenv("LOG_LEVEL", "INFO"))
+
+# Microphone capture format (WM8960 codec via sox fallback)
+SAMPLE_RATE = 48000
+CHANNELS = 2            # what the WM8960 delivers over I2S
+CAPTURE_CHANNELS = 1    # what we publish - voice is mono downstream, so
+                        # carrying stereo doubles DMA and pipe traffic
+
+# Per-chunk capture parameters, constant-folded once at import so the hot
+# read loop does no arithmetic on values that never change at runtime.
+# Chunks are exactly 10 ms: AudioSource.capture_frame only takes its
+# queue-bypassing fast path for 10 ms frames with queue_size_ms=0.
+CAPTURE_BYTES_PER_SAMPLE = 2 * CAPTURE_CHANNELS                # S16_LE frames
+CAPTURE_CHUNK_SIZE = SAMPLE_RATE * CAPTURE_BYTES_PER_SAMPLE // 100  # 10 ms
+CAPTURE_SAMPLES_PER_CHUNK = CAPTURE_CHUNK_SIZE // CAPTURE_BYTES_PER_SAMPLE
+
+
+def _mic_publish_options():
+    """Publish options tuned for conversational latency.
+
+    DTX stops the encoder going silent between words (its wake-up clips
+    first syllables) and RED would add redundant payloads we don't need
+    on a LAN. Fields are set best-effort so SDKs without them still get
+    plain defaults.
+    """
+    options = rtc.TrackPublishOptions()
+    for field, value in (("dtx", False), ("red", False)):
+        try:
+            setattr(options, field, value)
+        except (AttributeError, TypeError, ValueError):
+            pass
+    return options
+
+
+def _make_mic_source():
+    """Build the microphone AudioSource on the capture_frame fast path.
+
+    queue_size_ms=0 makes capture_frame return immediately instead of
+    traversing the source's internal buffer queue; older SDKs without the
+    kwarg get the default queue.
+    """
+    try:
+        return rtc.AudioSource(SAMPLE_RATE, CAPTURE_CHANNELS, queue_size_ms=0)
+    except TypeError:
+        return rtc.AudioSource(SAMPLE_RATE, CAPTURE_CHANNELS)
+
+
+# Signed tokens persisted across restarts, so a cold client start skips
+# the signing work (and any future token-server round trip) entirely
+TOKEN_CACHE = Path("~/.cache/grokie/token.json").expanduser()
+
+
+def _jwt_exp(jwt_token: str) -> float:
+    """Decode the exp claim from a JWT without verifying it."""
+    payload = jwt_token.split(".")[1]
+    payload += "=" * (-len(payload) % 4)  # restore stripped base64 padding
+    return json.loads(base64.urlsafe_b64decode(payload))["exp"]
+
 
 def generate_token(room_name: str, participant_name: str) -> str:
-    """Generate LiveKit access token."""
+    """Generate LiveKit access token (cached on disk across restarts)."""
+    # Warm start: reuse the cached token if it matches this identity and
+    # has at least 5 minutes of validity left
+    try:
+        cached = json.loads(TOKEN_CACHE.read_text())
+        if (cached["room"] == room_name
+                and cached["participant"] == participant_name
+                and cached["exp"] - time.time() > 300):
+            return cached["token"]
+    except (OSError, ValueError, KeyError):
+        pass
+
     token = api.AccessToken(LIVEKIT_API_KEY, LIVEKIT_API_SECRET) \
         .with_identity(participant_name) \
         .with_name("Raspberry Pi") \
@@ -34,22 +166,41 @@ def generate_token(room_name: str, participant_name: str) -> str:
             room=room_name,
             can_publish=True,
             can_subscribe=True,
-        ))
-    
-    return token.to_jwt()
+        )).to_jwt()
+
+    # Cache it (atomic rename so a crash never leaves a half-written file)
+    try:
+        TOKEN_CACHE.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = TOKEN_CACHE.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps({
+            "room": room_name,
+            "participant": participant_name,
+            "exp": _jwt_exp(token),
+            "token": token,
+        }))
+        os.replace(tmp_path, TOKEN_CACHE)
+    except (OSError, ValueError, KeyError):
+        pass
+
+    return token
 
 
 def setup_audio_output():
     """Set up audio output similar to whisplay (find sound card and set volume)."""
     try:
-        # Find the sound card index for wm8960soundcard (like whisplay does)
-        result = subprocess.run(
-            ["awk", "/wm8960soundcard/ {print $1}", "/proc/asound/cards"],
-            capture_output=True,
-            text=True
-        )
-        card_index = result.stdout.strip().split('\n')[0] if result.stdout.strip() else None
-        
+        # Find the sound card index for wm8960soundcard by reading
+        # /proc/asound/cards directly - forking awk for one line costs
+        # 30-50 ms on a Pi and adds a dependency for nothing
+        card_index = None
+        try:
+            with open("/proc/asound/cards") as cards:
+                for line in cards:
+                    if "wm8960soundcard" in line:
+                        card_index = line.split()[0]
+                        break
+        except OSError:
+            pass
+
         # Default to 1 if not found
         if not card_index or not card_index.isdigit():
             card_index = "1"
@@ -71,37 +222,271 @@ def setup_audio_output():
         return "1"
 
 
+async def capture_audio_from_wm8960(source, card_index):
+    """Capture raw audio from the WM8960 and publish it to LiveKit.
+
+    Used as the microphone fallback when MediaDevices can't open an input.
+    Prefers reading the PCM device in-process via alsaaudio; spawning sox
+    and reading its pipe is the fallback when pyalsaaudio is missing.
+    """
+    if alsaaudio is not None:
+        try:
+            await _capture_direct_alsa(source, card_index)
+            return
+        except Exception as e:
+            print(f"⚠️  Direct ALSA capture failed ({e}), falling back to sox")
+    await _capture_via_sox(source, card_index)
+
+
+async def _capture_direct_alsa(source, card_index):
+    """Read the WM8960 PCM device directly - no sox process or pipe."""
+    def _open_pcm(channels):
+        return alsaaudio.PCM(
+            alsaaudio.PCM_CAPTURE,
+            device=f"hw:{card_index},0",
+            rate=SAMPLE_RATE,
+            channels=channels,
+            format=alsaaudio.PCM_FORMAT_S16_LE,
+            periodsize=SAMPLE_RATE // 100,  # 10 ms periods, like the sox path
+        )
+
+    # Ask the codec for mono directly; when it insists on stereo, capture
+    # both channels and fold them to mono ourselves before publishing
+    downmix = False
+    try:
+        pcm = _open_pcm(CAPTURE_CHANNELS)
+    except alsaaudio.ALSAAudioError:
+        pcm = _open_pcm(CHANNELS)
+        downmix = True
+        if np is None:
+            raise RuntimeError("numpy required for stereo-to-mono downmix")
+
+    def _read_chunk():
+        """Blocking read (and downmix, if needed) for the executor thread.
+
+        Keeping the numpy work here, not in the coroutine, means the
+        event loop only ever sees ready-to-publish mono bytes - RTP send
+        timing never waits on sample arithmetic.
+        """
+        length, data = pcm.read()
+        if length > 0 and downmix:
+            # One vectorized pass: widen to int32, average L+R, and
+            # narrow back - halves the bytes handed to the encoder
+            stereo = np.frombuffer(data, dtype=np.int16).reshape(-1, CHANNELS)
+            mono = stereo.sum(axis=1, dtype=np.int32) >> 1
+            data = mono.astype(np.int16).tobytes()
+            length = len(data) // 2
+        return length, data
+
+    print("🎙️  Capturing from WM8960 via ALSA...")
+    loop = asyncio.get_running_loop()
+    # Bind once - the loop then does local loads per frame instead of
+    # re-walking the attribute chain 100x/s
+    capture = source.capture_frame
+    try:
+        while True:
+            length, data = await loop.run_in_executor(None, _read_chunk)
+            if length <= 0:
+                continue
+            frame = rtc.AudioFrame(
+                data=data,
+                sample_rate=SAMPLE_RATE,
+                num_channels=CAPTURE_CHANNELS,
+                samples_per_channel=length,
+            )
+            await capture(frame)
+    finally:
+        pcm.close()
+
+
+async def _capture_via_sox(source, card_index):
+    """Capture via a sox subprocess, publishing int16 chunks as-is."""
+    # remix 1-2 folds both WM8960 channels into one inside sox, so only
+    # half the bytes ever cross the pipe into Python
+    sox_cmd = [
+        "sox", "-q",
+        "-t", "alsa", f"hw:{card_index},0",
+        "-r", str(SAMPLE_RATE), "-c", str(CAPTURE_CHANNELS),
+        "-t", "raw", "-e", "signed-integer", "-b", "16", "-",
+        "remix", "1-2",
+    ]
+    process = await asyncio.create_subprocess_exec(
+        *sox_cmd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.DEVNULL,
+    )
+    print("🎙️  Capturing from WM8960 via sox...")
+    # Bind once outside the loop, as in the ALSA path
+    readexactly = process.stdout.readexactly
+    capture = source.capture_frame
+    try:
+        while True:
+            # readexactly always returns a full chunk, so there's no
+            # partial-read bookkeeping and no variable-size frames
+            try:
+                chunk = await readexactly(CAPTURE_CHUNK_SIZE)
+                samples = CAPTURE_SAMPLES_PER_CHUNK
+            except asyncio.IncompleteReadError as e:
+                chunk = e.partial
+                samples = len(chunk) // CAPTURE_BYTES_PER_SAMPLE
+            if not chunk:
+                break
+            frame = rtc.AudioFrame(
+                data=chunk,
+                sample_rate=SAMPLE_RATE,
+                num_channels=CAPTURE_CHANNELS,
+                samples_per_channel=samples,
+            )
+            await capture(frame)
+    finally:
+        if process.returncode is None:
+            process.terminate()
+            await process.wait()
+
+
+# The core reserved for audio, resolved before main() shrinks the
+# process affinity to the remaining ones (threads inherit their creator's
+# affinity, so the worker must not derive this at pin time)
+try:
+    _AUDIO_CPU = max(os.sched_getaffinity(0))
+except OSError:
+    _AUDIO_CPU = None
+
+
+def _set_audio_thread_priority():
+    """Best-effort: pin the calling thread to the last core with SCHED_FIFO.
+
+    The audio writer shares cores with the asyncio loop and Python GC,
+    whose pauses show up as ALSA underruns (audible clicks). Pinning the
+    writer to the highest-numbered core (isolate it with isolcpus= on the
+    kernel cmdline for full effect) and giving it real-time priority keeps
+    those pauses off the audio path. Both calls need privileges
+    (CAP_SYS_NICE for SCHED_FIFO), so failures are logged and ignored.
+    """
+    try:
+        if _AUDIO_CPU is not None:
+            os.sched_setaffinity(0, {_AUDIO_CPU})
+    except OSError as e:
+        print(f"⚠️  Could not pin audio thread to a core: {e}")
+    try:
+        os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(50))
+    except (OSError, PermissionError) as e:
+        print(f"⚠️  Could not set SCHED_FIFO for audio thread: {e}")
+        print("   (needs CAP_SYS_NICE, or '@audio - rtprio 95' in limits.d)")
+        try:
+            # Second best: raise our weight within SCHED_OTHER
+            os.nice(-10)
+        except OSError:
+            pass
+
+
 class ALSAAudioPlayer:
-    """Plays audio frames through ALSA using aplay."""
+    """Plays audio frames through ALSA.
+
+    Prefers writing the PCM device in-process via alsaaudio - no fork, no
+    stdin pipe, no extra copy per chunk - and falls back to piping into an
+    aplay subprocess when pyalsaaudio is unavailable.
+    """
     def __init__(self, sound_card_index="1", sample_rate=48000, channels=2):
         self.sound_card_index = sound_card_index
         self.sample_rate = sample_rate
         self.channels = channels
+        self.pcm = None
         self.process = None
         self.running = False
-        self.audio_queue = queue.Queue()
+        # Bounded hand-off FIFO: deque.append/popleft are single atomic
+        # ops (no Lock+Condition pair per transfer like queue.Queue), and
+        # maxlen gives drop-oldest for free - if playback stalls, latency
+        # stays bounded instead of building up. The depth is tunable: a
+        # flaky USB DAC may want more slack, a latency purist less.
+        queue_frames = int(os.getenv("AUDIO_QUEUE_FRAMES", "32"))
+        self.audio_queue = collections.deque(maxlen=queue_frames)
+        self._wake = threading.Event()
+        self._extract = None
         self.worker_thread = None
         
+    def configure(self, sample_rate, channels):
+        """Match the device format to the incoming frames (before start).
+
+        A rate/channel mismatch between the frames and the opened device
+        means pitch-shifted audio or constant underruns, so the fallback
+        path calls this with the first frame's format before starting.
+        """
+        if self.running:
+            return
+        self.sample_rate = sample_rate
+        self.channels = channels
+
+    def _period_and_buffer_frames(self):
+        """Resolve ALSA period/buffer sizing, overridable via env vars.
+
+        Defaults are 10 ms periods in a 100 ms buffer. PipeWire's ALSA
+        shim and some USB DACs pick pathological defaults, so users can
+        tune both without touching code; a larger buffer trades latency
+        for resilience when CPU headroom is tight.
+        """
+        period = int(os.getenv("ALSA_PERIOD_FRAMES", str(self.sample_rate // 100)))
+        buffer = int(os.getenv("ALSA_BUFFER_FRAMES", str(self.sample_rate // 10)))
+        return period, buffer
+
+    def _start_alsa(self):
+        """Open the playback PCM in-process; False when that fails."""
+        try:
+            pcm = alsaaudio.PCM(
+                alsaaudio.PCM_PLAYBACK,
+                alsaaudio.PCM_NORMAL,
+                device=f"hw:{self.sound_card_index},0",
+            )
+            pcm.setchannels(self.channels)
+            pcm.setrate(self.sample_rate)
+            pcm.setformat(alsaaudio.PCM_FORMAT_S16_LE)
+            period, _ = self._period_and_buffer_frames()
+            pcm.setperiodsize(period)  # 10 ms periods by default
+        except Exception as e:
+            print(f"⚠️  Could not open ALSA playback device: {e}")
+            return False
+
+        self.pcm = pcm
+        self.running = True
+        self.worker_thread = threading.Thread(target=self._audio_worker, daemon=True)
+        self.worker_thread.start()
+        print(f"✅ In-process ALSA playback started ({self.channels}ch, {self.sample_rate}Hz)")
+        return True
+
     def start(self):
         """Start the audio player."""
         if self.running:
             return
-            
+
+        # In-process playback first; aplay is the no-pyalsaaudio fallback
+        if alsaaudio is not None and self._start_alsa():
+            return True
+
         try:
             # Start aplay process
+            # Explicit 10 ms periods in a 100 ms buffer: aplay's default
+            # buffer is ~500 ms, which all becomes audible lag before the
+            # first sample and on every barge-in
+            period, buffer = self._period_and_buffer_frames()
             cmd = [
                 "aplay",
                 "-f", "S16_LE",
                 "-c", str(self.channels),
                 "-r", str(self.sample_rate),
                 "-D", f"hw:{self.sound_card_index},0",
+                f"--period-size={period}",
+                f"--buffer-size={buffer}",
                 "-"  # Read from stdin
             ]
+            # stdout/stderr go to DEVNULL, not PIPE: nothing ever read
+            # those pipes, so a chatty aplay would eventually fill the
+            # 64 KB kernel buffer and block mid-playback
             self.process = subprocess.Popen(
                 cmd,
                 stdin=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                stdout=subprocess.PIPE
+                stderr=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                bufsize=0  # unbuffered stdin: writes hit the pipe directly
             )
             self.running = True
             
@@ -115,46 +500,90 @@ class ALSAAudioPlayer:
             print(f"❌ Failed to start ALSA audio player: {e}")
             return False
     
+    def _write(self, audio_data):
+        if self.pcm is not None:
+            self.pcm.write(audio_data)
+        elif self.process and self.process.stdin:
+            # No flush: the pipe is unbuffered, so the write lands directly
+            self.process.stdin.write(audio_data)
+
     def _audio_worker(self):
-        """Worker thread that writes audio data to aplay."""
+        """Worker thread that drains the deque into the audio device."""
+        _set_audio_thread_priority()
+        # Coalesce queued 10 ms frames into ~30 ms device writes: a third
+        # of the syscalls and wakeups, for at most one batch of added
+        # latency - and only when frames are actually queueing up
+        batch_bytes = self.sample_rate * self.channels * 2 * 3 // 100
+        pending = bytearray()
         while self.running:
+            # Block until audio arrives (or stop() signals the event) -
+            # no periodic wakeups while idle, the thread just sleeps
+            self._wake.wait()
+            self._wake.clear()
+            if not self.running:
+                break
             try:
-                audio_data = self.audio_queue.get(timeout=0.1)
-                if self.process and self.process.stdin:
-                    self.process.stdin.write(audio_data)
-                    self.process.stdin.flush()
-            except queue.Empty:
-                continue
+                while self.audio_queue:
+                    pending += self.audio_queue.popleft()
+                    if len(pending) >= batch_bytes:
+                        self._write(pending)
+                        pending.clear()
+                if pending:
+                    # Never hold a partial batch across the wait - that
+                    # would trade latency for nothing
+                    self._write(pending)
+                    pending.clear()
+            except IndexError:
+                continue  # drained concurrently; nothing left to write
             except Exception as e:
                 if self.running:
                     print(f"⚠️  Audio write error: {e}")
                 break
     
+    def _enqueue(self, audio_data):
+        """Queue audio without ever blocking; maxlen drops the oldest."""
+        self.audio_queue.append(audio_data)
+        self._wake.set()
+
     def write_frame(self, audio_frame):
         """Write an audio frame to the player."""
         if not self.running:
             return
-            
-        try:
-            # Convert AudioFrame to bytes
-            # AudioFrame has samples property that's a list of int16 values
-            if hasattr(audio_frame, 'samples'):
-                import numpy as np
-                samples = np.array(audio_frame.samples, dtype=np.int16)
-                audio_data = samples.tobytes()
-                self.audio_queue.put(audio_data)
-            elif hasattr(audio_frame, 'data'):
-                self.audio_queue.put(audio_frame.data)
+
+        extract = self._extract
+        if extract is None:
+            # Probe the SDK's frame shape once, on the first frame, and
+            # bind an extractor - every later frame is a single call
+            # instead of re-running attribute lookups 100x/s
+            if getattr(audio_frame, 'data', None) is not None:
+                # AudioFrame.data is a memoryview over the frame's own
+                # int16 buffer; pcm.write and the pipe both take buffer-
+                # protocol objects, so it goes into the queue as-is - no
+                # numpy array, no intermediate bytes copy
+                extract = lambda f: f.data
+            elif hasattr(audio_frame, 'samples'):
+                # Older SDKs only expose samples as a list of int16 values
+                extract = lambda f: np.asarray(f.samples, dtype=np.int16).tobytes()
             else:
-                # Try to get raw bytes
-                audio_data = bytes(audio_frame)
-                self.audio_queue.put(audio_data)
+                # Last resort: the frame itself supports the buffer protocol
+                extract = bytes
+            self._extract = extract
+
+        try:
+            self._enqueue(extract(audio_frame))
         except Exception as e:
             print(f"⚠️  Error processing audio frame: {e}")
     
     def stop(self):
         """Stop the audio player."""
         self.running = False
+        self._wake.set()  # rouse the worker so it sees running=False
+        if self.pcm is not None:
+            try:
+                self.pcm.close()
+            except Exception:
+                pass
+            self.pcm = None
         if self.process:
             try:
                 if self.process.stdin:
@@ -171,62 +600,50 @@ class ALSAAudioPlayer:
             self.worker_thread.join(timeout=1)
 
 
-async def main():
-    """Main function to connect and handle voice interaction."""
-    print("🎤 GROK Voice Agent - Raspberry Pi Client")
-    print("=" * 50)
-    print(f"Connecting to: {LIVEKIT_URL}")
-    print(f"Room: {ROOM_NAME}")
-    print("=" * 50)
-    
-    # Set up audio output (like whisplay does)
-    card_index = setup_audio_output()
-    
-    # Set ALSA environment variables
-    os.environ['ALSA_CARD'] = card_index
-    os.environ['ALSA_PCM_DEVICE'] = "0"
-    
-    # Create MediaDevices for audio output (the proper way in Python SDK)
-    devices = rtc.MediaDevices()
-    
-    # Try to open audio output device
-    audio_player = None
-    try:
-        print("Setting up audio output device...")
-        audio_player = devices.open_output()
-        print("✅ Audio output device opened")
-    except Exception as e:
-        print(f"⚠️  Could not open audio output device: {e}")
-        print("   Will try to use ALSA directly as fallback")
-        audio_player = None
-    
-    # Fallback: Create ALSA audio player if MediaDevices failed
-    alsa_player = None
-    if audio_player is None:
-        alsa_player = ALSAAudioPlayer(sound_card_index=card_index, sample_rate=48000, channels=2)
-    
-    # Generate access token
-    print("\nGenerating access token...")
-    token = generate_token(ROOM_NAME, PARTICIPANT_NAME)
-    
-    # Create room
+def _wait_for_start():
+    """Block until the launcher writes START on stdin.
+
+    Returns False when stdin closes without a START (the launcher went
+    away), True once START arrives. readline() is used instead of line
+    iteration because iteration read-ahead could swallow a later STOP.
+    """
+    while True:
+        line = sys.stdin.readline()
+        if not line:
+            return False
+        if line.strip() == "START":
+            return True
+
+
+async def run_session(devices, audio_player, alsa_player, card_index, token):
+    """Connect to the room and run one voice session.
+
+    Returns True when the session ended on a STOP command - the caller
+    keeps the process alive and waits for the next START, so a toggle
+    never pays interpreter startup or the livekit imports again. Returns
+    False when the process should exit.
+    """
+    keep_running = False
+
+    # A Room is not reusable after disconnect, so each session gets a
+    # fresh one - unlike the imports and audio setup, this is cheap
     room = rtc.Room()
     
     # Set up event handlers (simplified like web client)
     @room.on("connected")
     def on_connected():
-        print("✅ Connected to room!")
-        print("🎤 Microphone is active - start speaking!")
-        print("Press Ctrl+C to disconnect\n")
-    
+        log.info("✅ Connected to room!")
+        log.info("🎤 Microphone is active - start speaking!")
+        log.info("Press Ctrl+C to disconnect\n")
+
     @room.on("disconnected")
     def on_disconnected():
-        print("\n❌ Disconnected from room")
-    
+        log.info("\n❌ Disconnected from room")
+
     @room.on("participant_connected")
     def on_participant_connected(participant: rtc.RemoteParticipant):
-        print(f"👤 Agent connected: {participant.identity}")
-        print(f"   Participant SID: {participant.sid}")
+        log.info("👤 Agent connected: %s", participant.identity)
+        log.debug("   Participant SID: %s", participant.sid)
     
     # Track if audio player has been started
     audio_player_started = False
@@ -245,7 +662,6 @@ async def main():
                 print(f"✅ Audio playback started")
             except Exception as e:
                 print(f"⚠️  Error starting player: {e}")
-                import traceback
                 traceback.print_exc()
     
     @room.on("track_subscribed")
@@ -258,15 +674,15 @@ async def main():
         
         # Handle audio tracks - Use MediaDevices player (proper Python SDK way)
         if track.kind == rtc.TrackKind.KIND_AUDIO and isinstance(track, rtc.RemoteAudioTrack):
-            print(f"\n🔊 Audio track received from {participant.identity}")
-            print(f"   Track: {track.name}")
-            
+            log.info("\n🔊 Audio track received from %s", participant.identity)
+            log.debug("   Track: %s", track.name)
+
             # Use MediaDevices player if available (preferred method)
             if audio_player is not None:
                 try:
                     audio_player.add_track(track)
-                    print(f"✅ Audio track added to MediaDevices player")
-                    
+                    log.debug("✅ Audio track added to MediaDevices player")
+
                     # Start playback if not already started (use create_task for async)
                     if not audio_player_started:
                         try:
@@ -283,74 +699,68 @@ async def main():
                                     # If loop exists but not running, schedule it
                                     asyncio.run(start_audio_player_if_needed())
                             except Exception as e:
-                                print(f"⚠️  Could not start audio player asynchronously: {e}")
+                                log.warning("⚠️  Could not start audio player asynchronously: %s", e)
                                 # Try synchronous start as fallback
                                 try:
                                     if hasattr(audio_player, 'start') and not asyncio.iscoroutinefunction(audio_player.start):
                                         audio_player.start()
                                         audio_player_started = True
-                                        print(f"✅ Audio playback started (synchronous)")
+                                        log.debug("✅ Audio playback started (synchronous)")
                                 except Exception as e2:
-                                    print(f"⚠️  Synchronous start also failed: {e2}")
+                                    log.warning("⚠️  Synchronous start also failed: %s", e2)
                     else:
-                        print(f"✅ Audio playback already active")
-                    print(f"   🔊 Audio should play through default output device")
+                        log.debug("✅ Audio playback already active")
+                    log.debug("   🔊 Audio should play through default output device")
                 except Exception as e:
-                    print(f"⚠️  Error adding track to player: {e}")
-                    import traceback
-                    traceback.print_exc()
+                    log.warning("⚠️  Error adding track to player: %s", e, exc_info=True)
             elif alsa_player is not None:
-                # Fallback to ALSA player - start it and subscribe to frames
-                print(f"   ⚠️  MediaDevices not available, using ALSA fallback")
+                # Fallback to ALSA player - pump frames from an AudioStream
+                log.debug("   ⚠️  MediaDevices not available, using ALSA fallback")
                 try:
-                    # Start the ALSA player
-                    if not alsa_player.running:
-                        alsa_player.start()
-                        print(f"✅ ALSA audio player started")
-                    
-                    # Subscribe to audio frames from the track
-                    def on_audio_frame(frame: rtc.AudioFrame):
-                        """Callback to handle audio frames from the track."""
+                    async def _pump():
+                        # rtc.AudioStream is the SDK's documented per-track
+                        # frame path - one code path, no attribute probing,
+                        # and frames arrive without an extra copy. Asking
+                        # the stream for the player's rate/channels makes
+                        # the SDK resample in native code; older SDKs
+                        # without those kwargs deliver the source format
+                        # and the player adopts it from the first frame.
                         try:
-                            alsa_player.write_frame(frame)
-                        except Exception as e:
-                            # Silently handle errors to avoid spam
-                            pass
-                    
-                    # Register frame callback
-                    # LiveKit Python SDK uses "frame" event for RemoteAudioTrack
-                    try:
-                        track.on("frame", on_audio_frame)
-                        print(f"✅ Audio frame subscription set up for ALSA player")
-                        print(f"   🔊 Audio should play through ALSA device")
-                    except AttributeError:
-                        # Try alternative method if "on" doesn't exist
+                            stream = rtc.AudioStream(
+                                track,
+                                sample_rate=alsa_player.sample_rate,
+                                num_channels=alsa_player.channels,
+                            )
+                        except TypeError:
+                            stream = rtc.AudioStream(track)
                         try:
-                            track.add_frame_listener(on_audio_frame)
-                            print(f"✅ Audio frame subscription set up for ALSA player (listener)")
-                            print(f"   🔊 Audio should play through ALSA device")
-                        except AttributeError:
-                            print(f"⚠️  Could not subscribe to audio frames - track doesn't support frame callbacks")
-                            print(f"   Track type: {type(track)}")
-                            print(f"   Available methods: {[m for m in dir(track) if not m.startswith('_')]}")
-                    except Exception as frame_error:
-                        print(f"⚠️  Error subscribing to audio frames: {frame_error}")
-                        print(f"   Audio playback may not work with ALSA fallback")
+                            async for ev in stream:
+                                if not alsa_player.running:
+                                    alsa_player.configure(
+                                        ev.frame.sample_rate,
+                                        ev.frame.num_channels,
+                                    )
+                                    alsa_player.start()
+                                alsa_player.write_frame(ev.frame)
+                        finally:
+                            await stream.aclose()
+
+                    asyncio.get_running_loop().create_task(_pump())
+                    log.debug("✅ AudioStream pump started for ALSA player")
+                    log.debug("   🔊 Audio should play through ALSA device")
                 except Exception as e:
-                    print(f"⚠️  Error setting up ALSA player: {e}")
-                    import traceback
-                    traceback.print_exc()
+                    log.warning("⚠️  Error setting up ALSA player: %s", e, exc_info=True)
             else:
-                print(f"❌ No audio playback method available")
+                log.warning("❌ No audio playback method available")
     
     @room.on("data_received")
     def on_data_received(data: rtc.DataPacket, participant: rtc.RemoteParticipant, kind: rtc.DataPacketKind):
         """Handle data packets (may contain text/transcription)."""
         try:
             text = data.data.decode('utf-8')
-            print(f"\n📝 Agent said: {text}")
-        except Exception as e:
-            print(f"📦 Data received (non-text): {len(data.data)} bytes")
+            log.info("\n📝 Agent said: %s", text)
+        except Exception:
+            log.info("📦 Data received (non-text): %d bytes", len(data.data))
     
     @room.on("track_published")
     def on_track_published(
@@ -358,8 +768,11 @@ async def main():
         participant: rtc.RemoteParticipant,
     ):
         if publication.kind == rtc.TrackKind.KIND_AUDIO:
-            print(f"🎤 Microphone track published: {publication.track_name}")
+            log.info("🎤 Microphone track published: %s", publication.track_name)
     
+    # Task driving the sox microphone fallback, if it ends up being used
+    capture_task = None
+
     try:
         # Connect to room with auto-subscribe (like web client)
         print("Connecting to LiveKit server...")
@@ -377,13 +790,23 @@ async def main():
             # Use MediaDevices to capture from default microphone (like web client)
             # This automatically captures audio from the system microphone
             microphone_track = await devices.open_input()
-            await room.local_participant.publish_track(microphone_track, rtc.TrackPublishOptions())
+            await room.local_participant.publish_track(microphone_track, _mic_publish_options())
             print("✅ Microphone ready!")
         except Exception as e:
-            print(f"⚠️  Warning: Could not set up microphone: {e}")
-            print("   Audio input may not work, but you can still receive audio.")
-            import traceback
-            traceback.print_exc()
+            print(f"⚠️  Could not open microphone via MediaDevices: {e}")
+            print("   Falling back to sox capture from the WM8960")
+            try:
+                mic_source = _make_mic_source()
+                mic_track = rtc.LocalAudioTrack.create_audio_track("pi-microphone", mic_source)
+                await room.local_participant.publish_track(mic_track, _mic_publish_options())
+                capture_task = asyncio.create_task(
+                    capture_audio_from_wm8960(mic_source, card_index)
+                )
+                print("✅ Microphone ready (sox fallback)!")
+            except Exception as e2:
+                print(f"⚠️  Warning: Could not set up microphone: {e2}")
+                print("   Audio input may not work, but you can still receive audio.")
+                traceback.print_exc()
         
         # Keep running until interrupted
         print("\n" + "=" * 50)
@@ -392,17 +815,142 @@ async def main():
         print("\n💡 The agent should respond when you speak.")
         print("   Watch for 'Agent said:' messages to see text responses.\n")
         
-        # Run forever until interrupted
-        await asyncio.sleep(3600 * 24)  # Run for 24 hours (or until Ctrl+C)
-        
+        if WAIT_FOR_START:
+            # Persistent mode: stay connected until the launcher sends
+            # STOP (toggle off) or closes the pipe (shutdown). The
+            # blocking readline runs on an executor thread so audio
+            # keeps flowing while we wait.
+            loop = asyncio.get_running_loop()
+            while True:
+                line = await loop.run_in_executor(None, sys.stdin.readline)
+                if not line:
+                    break  # launcher went away
+                if line.strip() == "STOP":
+                    keep_running = True
+                    break
+        else:
+            # Park on an event set from the signal handlers instead of a
+            # fake 24-hour timer: zero-cost while blocked, and shutdown
+            # returns promptly instead of waiting on a cancelled sleep
+            stop = asyncio.Event()
+            loop = asyncio.get_running_loop()
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                try:
+                    loop.add_signal_handler(sig, stop.set)
+                except (NotImplementedError, RuntimeError):
+                    pass  # non-main thread or unsupported platform
+            try:
+                await stop.wait()
+                print("\n\n🛑 Shutting down...")
+            finally:
+                for sig in (signal.SIGINT, signal.SIGTERM):
+                    try:
+                        loop.remove_signal_handler(sig)
+                    except (NotImplementedError, RuntimeError):
+                        pass
+
     except KeyboardInterrupt:
         print("\n\n🛑 Shutting down...")
     except Exception as e:
         print(f"\n❌ Error: {e}")
-        import traceback
         traceback.print_exc()
     finally:
-        # Clean up audio players
+        # Stop the sox capture fallback if it's running
+        if capture_task is not None:
+            capture_task.cancel()
+            try:
+                await capture_task
+            except (asyncio.CancelledError, Exception):
+                pass
+        # The players deliberately stay running - the PCM device is held
+        # warm for the process lifetime and reused by the next session
+        await room.disconnect()
+
+    return keep_running
+
+
+async def main():
+    """Main function to connect and handle voice interaction."""
+    print("🎤 GROK Voice Agent - Raspberry Pi Client")
+    print("=" * 50)
+    print(f"Connecting to: {LIVEKIT_URL}")
+    print(f"Room: {ROOM_NAME}")
+    print("=" * 50)
+
+    # Keep the event loop and executors off the audio core: the worker
+    # thread pins itself to the highest core (see
+    # _set_audio_thread_priority), so the rest of the process takes the
+    # others. Skipped on single-core machines and where affinity is
+    # restricted. Add isolcpus=<last core> to /boot/cmdline.txt to keep
+    # the kernel's own work off that core too.
+    try:
+        cpus = os.sched_getaffinity(0)
+        if _AUDIO_CPU is not None and len(cpus) > 1:
+            os.sched_setaffinity(0, cpus - {_AUDIO_CPU})
+    except OSError:
+        pass
+
+    # Set up audio output (like whisplay does)
+    card_index = setup_audio_output()
+
+    # Set ALSA environment variables
+    os.environ['ALSA_CARD'] = card_index
+    os.environ['ALSA_PCM_DEVICE'] = "0"
+    # Keep PulseAudio out of the path: an empty PULSE_SERVER makes
+    # libpulse fail fast instead of autospawning a daemon whose
+    # resample/mix graph adds hundreds of ms on top of the hw: device
+    # we address directly everywhere else
+    os.environ.setdefault('PULSE_SERVER', '')
+
+    # Create MediaDevices for audio output (the proper way in Python SDK)
+    devices = rtc.MediaDevices()
+
+    # Try to open audio output device
+    audio_player = None
+    try:
+        print("Setting up audio output device...")
+        audio_player = devices.open_output()
+        print("✅ Audio output device opened")
+    except Exception as e:
+        print(f"⚠️  Could not open audio output device: {e}")
+        print("   Will try to use ALSA directly as fallback")
+        audio_player = None
+
+    # Fallback: Create ALSA audio player if MediaDevices failed. Opened
+    # here, once, for the whole process lifetime: the device stays warm
+    # across reconnects, so first-audio-out after a subscription is just
+    # the first write instead of open + configure + start (and a stale
+    # holder of the device can't fail us mid-session)
+    alsa_player = None
+    if audio_player is None:
+        alsa_player = ALSAAudioPlayer(sound_card_index=card_index, sample_rate=48000, channels=2)
+        alsa_player.start()
+
+    # Generate access token
+    print("\nGenerating access token...")
+    token = generate_token(ROOM_NAME, PARTICIPANT_NAME)
+
+    # In warm-start mode everything above (imports, audio setup, token) is
+    # already paid for; park here until the launcher tells us to connect
+    if WAIT_FOR_START:
+        print("🕒 Warm start: waiting for START on stdin...")
+        if not _wait_for_start():
+            # stdin closed without a START - launcher went away
+            return
+
+    try:
+        # Sessions loop for as long as the launcher keeps toggling: each
+        # STOP disconnects and parks on stdin for the next START, so only
+        # the first session ever pays startup cost
+        while True:
+            again = await run_session(devices, audio_player, alsa_player, card_index, token)
+            if not again:
+                break
+            print("\n🔁 Disconnected; staying warm for the next START...")
+            loop = asyncio.get_running_loop()
+            if not await loop.run_in_executor(None, _wait_for_start):
+                break
+    finally:
         if alsa_player:
             alsa_player.stop()
         if audio_player:
@@ -410,7 +958,6 @@ async def main():
                 await audio_player.aclose()
             except:
                 pass
-        await room.disconnect()
         print("👋 Goodbye!")
 
 
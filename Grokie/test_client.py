@@ -5,6 +5,7 @@ This requires a LiveKit server to be running.
 
 import asyncio
 import os
+from datetime import timedelta
 from dotenv import load_dotenv
 from livekit import rtc
 from livekit import api
@@ -26,10 +27,12 @@ async def connect_to_agent():
     print(f"Connecting to LiveKit server at {url}...")
     print(f"Room: {room_name}")
     
-    # Create access token
+    # Create access token (explicit 6h TTL so a saved/reused token stays
+    # valid across reconnects instead of expiring at the SDK default)
     token = api.AccessToken(api_key, api_secret) \
         .with_identity("user-123") \
         .with_name("Test User") \
+        .with_ttl(timedelta(hours=6)) \
         .with_grants(api.VideoGrants(room_join=True, room=room_name))
     
     # Connect to room
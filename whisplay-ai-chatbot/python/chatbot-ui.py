@@ -258,11 +258,16 @@ class RenderThread(threading.Thread):
     def stop(self):
         self.running = False
 
-def update_display_data(status=None, emoji=None, text=None, 
+def update_display_data(status=None, emoji=None, text=None, text_append=None,
                   scroll_speed=None, battery_level=None, battery_color=None, image_path=None):
     global current_status, current_emoji, current_text, current_battery_level
     global current_battery_color, current_scroll_top, current_scroll_speed, current_image_path
 
+    # text_append carries only the new suffix, so clients streaming a
+    # growing reply don't resend the whole text every update
+    if text is None and text_append is not None:
+        text = current_text + text_append
+
     # If text is not continuation of previous, reset scroll position
     if text is not None and not text.startswith(current_text):
         current_scroll_top = 0
@@ -366,6 +371,7 @@ def handle_client(client_socket, addr, whisplay):
                     status = content.get("status", None)
                     emoji = content.get("emoji", None)
                     text = content.get("text", None)
+                    text_append = content.get("text_append", None)
                     rgbled = content.get("RGB", None)
                     brightness = content.get("brightness", None)
                     scroll_speed = content.get("scroll_speed", 2)
@@ -405,11 +411,13 @@ def handle_client(client_socket, addr, whisplay):
                                 camera_thread = None
                             camera_mode = False
                         
-                    if (text is not None) or (status is not None) or (emoji is not None) or \
+                    if (text is not None) or (text_append is not None) or \
+                       (status is not None) or (emoji is not None) or \
                        (battery_level is not None) or (battery_color is not None) or \
                        (image_path is not None):
                         update_display_data(status=status, emoji=emoji,
-                                     text=text, scroll_speed=scroll_speed,
+                                     text=text, text_append=text_append,
+                                     scroll_speed=scroll_speed,
                                      battery_level=battery_level, battery_color=battery_tuple,
                                      image_path=image_path)
 
@@ -1,29 +1,35 @@
-import RPi.GPIO as GPIO
-import time
-
-# 定义连接开关的物理引脚号
-SWITCH_PIN = 11  # 物理引脚 11
-
-# 设置 GPIO 模式为 BOARD 编号 (使用物理引脚号)
-GPIO.setmode(GPIO.BOARD)
-
-# 设置 GPIO 引脚为输入模式，并启用上拉电阻
-GPIO.setup(SWITCH_PIN, GPIO.IN, pull_up_down=GPIO.PUD_UP)
-
-try:
-    print(f"正在监听连接到物理引脚 {SWITCH_PIN} (GPIO {GPIO.gpio_function(SWITCH_PIN)}) 的开关...")
-    while True:
-        # 读取开关的状态
-        switch_state = GPIO.input(SWITCH_PIN)
-
-        if switch_state == GPIO.LOW:
-            print("开关已按下")
-        else:
-            print("开关已释放")
-
-        time.sleep(0.2)
-
-except KeyboardInterrupt:
-    print("程序已停止")
-finally:
-    GPIO.cleanup()
\ No newline at end of file
+import RPi.GPIO as GPIO
+import signal
+
+# 定义连接开关的物理引脚号
+SWITCH_PIN = 11  # 物理引脚 11
+
+# 设置 GPIO 模式为 BOARD 编号 (使用物理引脚号)
+GPIO.setmode(GPIO.BOARD)
+
+# 设置 GPIO 引脚为输入模式，并启用上拉电阻
+GPIO.setup(SWITCH_PIN, GPIO.IN, pull_up_down=GPIO.PUD_UP)
+
+
+def on_switch_change(channel):
+    # 中断回调：读取当前电平判断是按下还是释放
+    if GPIO.input(channel) == GPIO.LOW:
+        print("开关已按下")
+    else:
+        print("开关已释放")
+
+
+try:
+    print(f"正在监听连接到物理引脚 {SWITCH_PIN} (GPIO {GPIO.gpio_function(SWITCH_PIN)}) 的开关...")
+
+    # 边沿触发中断代替轮询：空闲时线程休眠，CPU 占用接近零，
+    # 按键响应从平均约 100ms 降到毫秒级；bouncetime 做硬件消抖
+    GPIO.add_event_detect(SWITCH_PIN, GPIO.BOTH, callback=on_switch_change, bouncetime=50)
+
+    # 主线程挂起等待信号，所有工作都在 GPIO 中断线程里完成
+    signal.pause()
+
+except KeyboardInterrupt:
+    print("程序已停止")
+finally:
+    GPIO.cleanup()
@@ -1,60 +1,98 @@
-import RPi.GPIO as GPIO
-import time
-
-# 定义RGB LED的GPIO引脚（物理编号）
-RED_PIN = 22
-GREEN_PIN = 18
-BLUE_PIN = 16
-
-# 设置GPIO模式
-GPIO.setmode(GPIO.BOARD)
-GPIO.setup(RED_PIN, GPIO.OUT)
-GPIO.setup(GREEN_PIN, GPIO.OUT)
-GPIO.setup(BLUE_PIN, GPIO.OUT)
-
-# 设置PWM，频率为1kHz
-freq = 100
-red_pwm = GPIO.PWM(RED_PIN, freq)
-green_pwm = GPIO.PWM(GREEN_PIN, freq)
-blue_pwm = GPIO.PWM(BLUE_PIN, freq)
-
-# 启动PWM，占空比为0（LED熄灭）
-red_pwm.start(0)
-green_pwm.start(0)
-blue_pwm.start(0)
-
-def set_color(r, g, b):
-    """
-    设置RGB颜色，r, g, b 取值范围 0-255
-    由于是共阳LED，需要对占空比进行转换
-    """
-    red_pwm.ChangeDutyCycle(100 - (r / 255 * 100))
-    green_pwm.ChangeDutyCycle(100 - (g / 255 * 100))
-    blue_pwm.ChangeDutyCycle(100 - (b / 255 * 100))
-
-try:
-    while True:
-        set_color(255, 0, 0)  # 红色
-        time.sleep(1)
-        set_color(0, 255, 0)  # 绿色
-        time.sleep(1)
-        set_color(0, 0, 255)  # 蓝色
-        time.sleep(1)
-        set_color(255, 255, 0)  # 黄色
-        time.sleep(1)
-        set_color(0, 255, 255)  # 青色
-        time.sleep(1)
-        set_color(255, 0, 255)  # 品红色
-        time.sleep(1)
-        set_color(255, 255, 255)  # 白色
-        time.sleep(1)
-        set_color(0, 0, 0)  # 关闭
-        time.sleep(1)
-except KeyboardInterrupt:
-    pass
-
-# 清理GPIO
-red_pwm.stop()
-green_pwm.stop()
-blue_pwm.stop()
-GPIO.cleanup()
+import time
+
+try:
+    import pigpio
+except ImportError:
+    pigpio = None
+
+# 定义RGB LED的GPIO引脚（物理编号）
+RED_PIN = 22
+GREEN_PIN = 18
+BLUE_PIN = 16
+
+# 物理引脚号到 BCM 编号的映射（pigpio 只接受 BCM 编号），启动时转换一次
+_BOARD_TO_BCM = {22: 25, 18: 24, 16: 23}
+
+# PWM 频率
+freq = 800
+
+pi = None
+red_pwm = green_pwm = blue_pwm = None
+
+if pigpio is not None:
+    # 优先用 pigpio：PWM 由 DMA 驱动，不占 CPU，Pi 忙时也不会闪烁；
+    # RPi.GPIO 的软件 PWM 是 Python 线程逐位翻转的，负载高就可见抖动
+    pi = pigpio.pi()
+    if not pi.connected:
+        pi = None
+
+if pi is not None:
+    for pin in (RED_PIN, GREEN_PIN, BLUE_PIN):
+        bcm = _BOARD_TO_BCM[pin]
+        pi.set_PWM_frequency(bcm, freq)
+        pi.set_PWM_range(bcm, 255)
+        pi.set_PWM_dutycycle(bcm, 255)  # 共阳：满占空比 = 熄灭
+else:
+    # 回退到 RPi.GPIO 软件 PWM（pigpiod 未运行时）
+    import RPi.GPIO as GPIO
+
+    GPIO.setmode(GPIO.BOARD)
+    GPIO.setup(RED_PIN, GPIO.OUT)
+    GPIO.setup(GREEN_PIN, GPIO.OUT)
+    GPIO.setup(BLUE_PIN, GPIO.OUT)
+
+    red_pwm = GPIO.PWM(RED_PIN, freq)
+    green_pwm = GPIO.PWM(GREEN_PIN, freq)
+    blue_pwm = GPIO.PWM(BLUE_PIN, freq)
+
+    # 启动PWM，占空比为0（LED熄灭）
+    red_pwm.start(0)
+    green_pwm.start(0)
+    blue_pwm.start(0)
+
+
+def set_color(r, g, b):
+    """
+    设置RGB颜色，r, g, b 取值范围 0-255
+    由于是共阳LED，需要对占空比进行转换
+    """
+    if pi is not None:
+        pi.set_PWM_dutycycle(_BOARD_TO_BCM[RED_PIN], 255 - r)
+        pi.set_PWM_dutycycle(_BOARD_TO_BCM[GREEN_PIN], 255 - g)
+        pi.set_PWM_dutycycle(_BOARD_TO_BCM[BLUE_PIN], 255 - b)
+    else:
+        red_pwm.ChangeDutyCycle(100 - (r / 255 * 100))
+        green_pwm.ChangeDutyCycle(100 - (g / 255 * 100))
+        blue_pwm.ChangeDutyCycle(100 - (b / 255 * 100))
+
+
+try:
+    while True:
+        set_color(255, 0, 0)  # 红色
+        time.sleep(1)
+        set_color(0, 255, 0)  # 绿色
+        time.sleep(1)
+        set_color(0, 0, 255)  # 蓝色
+        time.sleep(1)
+        set_color(255, 255, 0)  # 黄色
+        time.sleep(1)
+        set_color(0, 255, 255)  # 青色
+        time.sleep(1)
+        set_color(255, 0, 255)  # 品红色
+        time.sleep(1)
+        set_color(255, 255, 255)  # 白色
+        time.sleep(1)
+        set_color(0, 0, 0)  # 关闭
+        time.sleep(1)
+except KeyboardInterrupt:
+    pass
+
+# 清理
+if pi is not None:
+    set_color(0, 0, 0)
+    pi.stop()
+else:
+    red_pwm.stop()
+    green_pwm.stop()
+    blue_pwm.stop()
+    GPIO.cleanup()
@@ -1,12 +1,109 @@
 import socket
 import json
+import queue
+import selectors
+import sys
 import time
 import threading
 
+try:
+    # orjson 是 C 实现，直接输出/接受 bytes，省掉 str 构造和编解码
+    import orjson
+
+    def _dump_json(obj):
+        return orjson.dumps(obj)
+
+    _load_json = orjson.loads
+    _JSONDecodeError = orjson.JSONDecodeError
+except ImportError:
+    def _dump_json(obj):
+        return json.dumps(obj).encode("utf-8")
+
+    _load_json = json.loads
+    _JSONDecodeError = json.JSONDecodeError
+
+class _SelectorHub:
+    """所有客户端 socket 共用的单线程接收中枢
+
+    每个客户端各起一个阻塞 recv 线程，综合测试时就是 N 个线程在
+    来回切换；这里用 selectors（Linux 上是 epoll）把所有 socket
+    注册到同一个后台线程，按可读事件回调各客户端处理
+    """
+    def __init__(self):
+        self._sel = selectors.DefaultSelector()
+        self._lock = threading.Lock()
+        self._thread = None
+        # 自唤醒管道：注册/注销时打断阻塞中的 select
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._sel.register(self._wake_r, selectors.EVENT_READ, None)
+
+    def register(self, sock, callback):
+        with self._lock:
+            self._sel.register(sock, selectors.EVENT_READ, callback)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+        self._wake_w.send(b"\0")
+
+    def unregister(self, sock):
+        with self._lock:
+            try:
+                self._sel.unregister(sock)
+            except (KeyError, ValueError):
+                pass
+        self._wake_w.send(b"\0")
+
+    def _run(self):
+        while True:
+            for key, _ in self._sel.select():
+                if key.data is None:
+                    self._wake_r.recv(64)
+                else:
+                    key.data()  # 回调自行 recv 并分帧
+
+_HUB = _SelectorHub()
+
+# 接收线程里的 print 会抢 stdout 的内部锁，让网络线程卡在终端 I/O 上；
+# 改为投递到有界队列，由专门的日志线程串行输出，队列满则丢弃
+_LOG_Q = queue.Queue(maxsize=1024)
+
+def _log(msg):
+    try:
+        _LOG_Q.put_nowait(msg)
+    except queue.Full:
+        pass
+
+def _log_worker():
+    while True:
+        sys.stdout.write(_LOG_Q.get() + "\n")
+
+threading.Thread(target=_log_worker, daemon=True).start()
+
+# 已知消息键的分发表（按优先级排列）：一次 dict.get 取处理函数，
+# 代替在热循环里逐个 in/== 链式判断
+_HANDLERS = {
+    "response": lambda v: _log(f"[Client] 服务器响应: {v}"),
+    "event": lambda v: _log(f"[Client] 服务器事件: {v}"),
+}
+
+def make_preamble(invariant_dict):
+    """预先序列化循环中不变的字段，返回去掉结尾 '}' 的前缀 bytes
+
+    配合 send_prefixed 使用：热循环里只编码变化的字段，再拼接
+    """
+    return _dump_json(invariant_dict)[:-1]
+
 class ScrollTestClient:
-    def __init__(self, host='0.0.0.0', port=12345):
+    def __init__(self, host='0.0.0.0', port=12345, recv_bufsize=65536):
         self.host = host
         self.port = port
+        # 每次 recv 最多取 64KiB：1KiB 意味着每千字节一次系统调用，
+        # 性能测试里单条消息就有几十 KB
+        self.recv_bufsize = recv_bufsize
+        # recv_into 复用的固定缓冲区：recv() 每次都新分配一个 bytes，
+        # 长跑的交互测试里会持续制造垃圾回收压力
+        self._rbuf = bytearray(recv_bufsize)
+        self._rmv = memoryview(self._rbuf)
         self.socket = None
         self.connected = False
         
@@ -14,47 +111,75 @@ class ScrollTestClient:
         """连接到服务器"""
         try:
             self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            # 关闭 Nagle：小 JSON 帧接连发送时 Nagle 会攒包，最多拖 40ms；
+            # 同时把收发缓冲提到 256KiB，匹配性能测试里不断变长的文本
+            self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 262144)
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 262144)
             self.socket.connect((self.host, self.port))
             self.connected = True
+            self._buf = bytearray()
             print(f"[Client] 已连接到 {self.host}:{self.port}")
-            
-            # 启动接收线程
-            receive_thread = threading.Thread(target=self.receive_messages)
-            receive_thread.daemon = True
-            receive_thread.start()
-            
+
+            # 注册到共享的 selector 中枢，不再为每个客户端起接收线程
+            _HUB.register(self.socket, self._on_readable)
+
             return True
         except Exception as e:
             print(f"[Client] 连接失败: {e}")
             return False
     
-    def receive_messages(self):
-        """接收服务器消息"""
-        buffer = ""
-        while self.connected:
-            try:
-                data = self.socket.recv(1024).decode("utf-8")
-                if not data:
-                    break
-                    
-                buffer += data
-                while "\n" in buffer:
-                    line, buffer = buffer.split("\n", 1)
-                    if line.strip():
-                        if line == "OK":
-                            print("[Client] 服务器确认: OK")
-                        else:
-                            try:
-                                response = json.loads(line)
-                                if "response" in response:
-                                    print(f"[Client] 服务器响应: {response['response']}")
-                                elif "event" in response:
-                                    print(f"[Client] 服务器事件: {response['event']}")
-                            except json.JSONDecodeError:
-                                print(f"[Client] 收到消息: {line}")
-                                
-            except Exception as e:
-                print(f"[Client] 接收消息错误: {e}")
+    def _on_readable(self):
+        """selector 线程回调：读一批数据并按行分帧
+
+        bytearray 累积 + find 分帧：str 拼接每次都要重新分配并复制
+        整个前缀（一行跨多次 recv 时是 O(n²)），这里只对切出的完整行
+        解码一次，删除已消费前缀是 bytearray 的原地操作
+        """
+        try:
+            n = self.socket.recv_into(self._rmv)
+        except Exception as e:
+            if self.connected:
+                _log(f"[Client] 接收消息错误: {e}")
+            _HUB.unregister(self.socket)
+            return
+        if not n:
+            _HUB.unregister(self.socket)
+            return
+
+        buf = self._buf
+        buf.extend(self._rmv[:n])
+        while True:
+            idx = buf.find(b"\n")
+            if idx < 0:
+                break
+            line = bytes(buf[:idx])
+            del buf[:idx + 1]
+            self._handle_line(line)
+
+    def _handle_line(self, line):
+        """处理一行完整消息（bytes）"""
+        # 只处理 CRLF 的 \r 和空行；strip() 会把整行扫一遍找空白，
+        # 对性能测试里的大帧是白费的 O(n) 扫描
+        if line.endswith(b"\r"):
+            line = line[:-1]
+        if not line:
+            return
+        # 确认帧占了绝大多数流量（服务器每条消息都回 OK），
+        # 在 bytes 层面直接比对，完全跳过 UTF-8 解码和 JSON 解析
+        if line == b"OK":
+            _log("[Client] 服务器确认: OK")
+            return
+        # 直接对 bytes 解析（orjson/stdlib 都支持），解析失败的行才解码
+        try:
+            response = _load_json(line)
+        except _JSONDecodeError:
+            _log(f"[Client] 收到消息: {line.decode('utf-8', 'replace')}")
+            return
+        for key, handler in _HANDLERS.items():
+            value = response.get(key)
+            if value is not None:
+                handler(value)
                 break
     
     def send_message(self, message_dict):
@@ -64,25 +189,102 @@ class ScrollTestClient:
             return False
             
         try:
-            message_json = json.dumps(message_dict) + "\n"
-            self.socket.send(message_json.encode("utf-8"))
+            # sendall 代替 send：send 可能部分写入，截断带换行符的消息帧
+            self.socket.sendall(_dump_json(message_dict) + b"\n")
+            return True
+        except (BrokenPipeError, ConnectionResetError) as e:
+            # 对端已关闭，标记断开，后续发送走「未连接」的快速失败路径
+            print(f"[Client] 连接已断开: {e}")
+            self.connected = False
+            return False
+        except Exception as e:
+            print(f"[Client] 发送消息失败: {e}")
+            return False
+
+    def send_prefixed(self, preamble, **fields):
+        """发送「预编码前缀 + 本次变化字段」拼成的消息
+
+        preamble 由 make_preamble 生成；不变的部分不用每轮重新序列化
+        """
+        if not self.connected:
+            print("[Client] 未连接到服务器")
+            return False
+
+        try:
+            tail = _dump_json(fields)  # b'{"text":...}'
+            self.socket.sendall(preamble + b"," + tail[1:] + b"\n")
             return True
+        except (BrokenPipeError, ConnectionResetError) as e:
+            print(f"[Client] 连接已断开: {e}")
+            self.connected = False
+            return False
         except Exception as e:
             print(f"[Client] 发送消息失败: {e}")
             return False
     
+    def send_many(self, message_dicts):
+        """把多条消息合并成一次 sendall（每批一次系统调用）
+
+        适合不需要逐条视觉间隔的吞吐场景；需要间隔展示的循环
+        仍然逐条 send_message
+        """
+        if not self.connected:
+            print("[Client] 未连接到服务器")
+            return False
+
+        try:
+            payload = b"".join(_dump_json(d) + b"\n" for d in message_dicts)
+            self.socket.sendall(payload)
+            return True
+        except (BrokenPipeError, ConnectionResetError) as e:
+            print(f"[Client] 连接已断开: {e}")
+            self.connected = False
+            return False
+        except Exception as e:
+            print(f"[Client] 发送消息失败: {e}")
+            return False
+
     def disconnect(self):
         """断开连接"""
         self.connected = False
         if self.socket:
+            _HUB.unregister(self.socket)
             self.socket.close()
             print("[Client] 已断开连接")
 
-def test_continuation_text():
+def _to_deltas(parts):
+    """把逐步增长的全文列表转成「首条全文 + 后续增量」
+
+    测试数据保留全文形式便于阅读，但逐条全文发送是 O(n²) 的流量；
+    服务端支持 text_append 追加，只需要发新增的后缀
+    """
+    return [parts[0]] + [cur[len(prev):] for prev, cur in zip(parts, parts[1:])]
+
+def run_scenario(client, steps, invariant=None, progress=None):
+    """按 (字段, 间隔秒) 步骤表驱动发送循环
+
+    各场景原本手写几乎相同的 发送/sleep 循环；统一到这一个循环后，
+    步骤表可以预先构造，invariant 里的不变字段走预编码前缀发送
+    """
+    preamble = make_preamble(invariant) if invariant else None
+    total = len(steps)
+    for i, (fields, delay) in enumerate(steps):
+        if progress:
+            print(f"[Test] {progress} {i+1}/{total}")
+        if preamble is not None:
+            client.send_prefixed(preamble, **fields)
+        else:
+            client.send_message(fields)
+        if delay:
+            time.sleep(delay)
+
+def test_continuation_text(client=None):
     """测试延续文字功能"""
-    client = ScrollTestClient()
-    
-    if not client.connect():
+    own_client = client is None
+    if own_client:
+        client = ScrollTestClient()
+
+    if not client.connected and not client.connect():
         return
     
     try:
@@ -110,13 +312,14 @@ def test_continuation_text():
             "用户：你好，请介绍一下Python的特点。\n\nAI：Python是一种高级编程语言，具有以下主要特点：\n\n1. 简洁易读：Python语法接近自然语言，代码可读性强。\n\n2. 跨平台性：可以在Windows、Linux、macOS等系统运行。\n\n3. 丰富的库生态：拥有庞大的第三方库支持，涵盖Web开发、数据科学、人工智能等领域。\n\n4. 动态类型：变量类型在运行时确定，提高开发效率。\n\n5. 解释执行：无需编译，直接执行，便于调试和快速原型开发。"
         ]
         
-        for i, part in enumerate(conversation_parts):
-            print(f"[Test] 发送文本片段 {i+1}/{len(conversation_parts)}")
-            client.send_message({
-                "text": part,
-                "scroll_speed": 2
-            })
-            time.sleep(2)  # 模拟AI生成文字的间隔
+        run_scenario(
+            client,
+            # 2 秒间隔模拟AI生成文字的节奏
+            [({"text" if i == 0 else "text_append": part}, 2)
+             for i, part in enumerate(_to_deltas(conversation_parts))],
+            invariant={"scroll_speed": 2},
+            progress="发送文本片段",
+        )
         
         # 等待滚动完成
         time.sleep(5)
@@ -149,13 +352,13 @@ def test_continuation_text():
             "[2025-08-10 14:30:01] 系统启动完成\n[2025-08-10 14:30:02] 加载配置文件\n[2025-08-10 14:30:03] 连接数据库成功\n[2025-08-10 14:30:04] 启动Web服务器\n[2025-08-10 14:30:05] 所有服务运行正常\n[2025-08-10 14:30:06] 用户认证模块加载\n[2025-08-10 14:30:07] 缓存系统初始化完成"
         ]
         
-        for i, log_text in enumerate(log_entries):
-            print(f"[Test] 发送日志更新 {i+1}/{len(log_entries)}")
-            client.send_message({
-                "text": log_text,
-                "scroll_speed": 3
-            })
-            time.sleep(1.5)
+        run_scenario(
+            client,
+            [({"text" if i == 0 else "text_append": log_text}, 1.5)
+             for i, log_text in enumerate(_to_deltas(log_entries))],
+            invariant={"scroll_speed": 3},
+            progress="发送日志更新",
+        )
         
         time.sleep(3)
         
@@ -164,12 +367,11 @@ def test_continuation_text():
         battery_levels = [100, 85, 70, 55, 40, 25, 10]
         battery_colors = ["#00FF00", "#66FF00", "#CCFF00", "#FFFF00", "#FF6600", "#FF3300", "#FF0000"]
         
-        for level, color in zip(battery_levels, battery_colors):
-            client.send_message({
-                "battery_level": level,
-                "battery_color": color
-            })
-            time.sleep(0.8)
+        run_scenario(
+            client,
+            [({"battery_level": level, "battery_color": color}, 0.8)
+             for level, color in zip(battery_levels, battery_colors)],
+        )
         
         # 测试场景5: 混合更新（状态+延续文字）
         print("\n=== 测试场景5: 混合更新测试 ===")
@@ -185,14 +387,16 @@ def test_continuation_text():
         emojis = ["📖", "🏡", "🌸", "🌺", "🐦"]
         statuses = ["开始", "设定", "日常", "转折", "照料"]
         
-        for i, (story, emoji, status) in enumerate(zip(story_parts, emojis, statuses)):
-            client.send_message({
+        run_scenario(
+            client,
+            [({
                 "status": f"故事阶段: {status}",
                 "emoji": emoji,
-                "text": story,
-                "scroll_speed": 2
-            })
-            time.sleep(3)
+                "text" if i == 0 else "text_append": story,
+            }, 3)
+             for i, (story, emoji, status) in enumerate(zip(_to_deltas(story_parts), emojis, statuses))],
+            invariant={"scroll_speed": 2},
+        )
         
         print("\n=== 测试完成，等待最后滚动... ===")
         time.sleep(5)
@@ -200,27 +404,30 @@ def test_continuation_text():
     except KeyboardInterrupt:
         print("\n[Test] 测试被用户中断")
     finally:
-        client.disconnect()
+        if own_client:
+            client.disconnect()
 
-def test_performance():
+def test_performance(client=None):
     """性能测试：发送超长文本"""
-    client = ScrollTestClient()
-    
-    if not client.connect():
+    own_client = client is None
+    if own_client:
+        client = ScrollTestClient()
+
+    if not client.connected and not client.connect():
         return
     
     try:
         print("\n=== 性能测试: 超长文本 ===")
         
-        # 生成超长文本
+        # 生成超长文本：每段只构造一次，增量追加后 join，
+        # 替代原来「每轮从头 += 重拼全文」的双重循环（总复制量是立方级）
         long_text_parts = []
         base_text = "这是一个性能测试，用来验证优化后的滚动渲染系统能否高效处理长文本内容。"
-        
+
+        segments = []
         for i in range(10):
-            accumulated_text = ""
-            for j in range(i + 1):
-                accumulated_text += f"第{j+1}段：{base_text} " * (j + 1) + "\n\n"
-            long_text_parts.append(accumulated_text.strip())
+            segments.append(f"第{i+1}段：{base_text} " * (i + 1))
+            long_text_parts.append("\n\n".join(segments).strip())
         
         client.send_message({
             "status": "性能测试",
@@ -231,14 +438,16 @@ def test_performance():
         
         for i, text_part in enumerate(long_text_parts):
             print(f"[Performance] 发送文本片段 {i+1}/{len(long_text_parts)} (长度: {len(text_part)} 字符)")
-            start_time = time.time()
-            
+            # perf_counter 是单调高精度时钟；time.time 受 NTP 调整影响，
+            # 测出来的发送耗时可能为负或跳变
+            start_time = time.perf_counter()
+
             client.send_message({
                 "text": text_part,
                 "scroll_speed": 4  # 更快的滚动速度用于测试
             })
-            
-            send_time = time.time() - start_time
+
+            send_time = time.perf_counter() - start_time
             print(f"[Performance] 发送耗时: {send_time:.3f}秒")
             time.sleep(2)
         
@@ -248,13 +457,16 @@ def test_performance():
     except KeyboardInterrupt:
         print("\n[Performance] 性能测试被中断")
     finally:
-        client.disconnect()
+        if own_client:
+            client.disconnect()
 
-def test_interactive_chat():
+def test_interactive_chat(client=None):
     """交互式聊天测试"""
-    client = ScrollTestClient()
-    
-    if not client.connect():
+    own_client = client is None
+    if own_client:
+        client = ScrollTestClient()
+
+    if not client.connected and not client.connect():
         return
     
     try:
@@ -280,31 +492,37 @@ def test_interactive_chat():
                 break
             
             if user_input:
-                # 添加到对话历史
+                # 添加到对话历史，只发送新增的部分（首条发全文）
                 if conversation_history:
-                    conversation_history += f"\n\n用户: {user_input}"
+                    delta = f"\n\n用户: {user_input}"
+                    conversation_history += delta
+                    client.send_message({
+                        "text_append": delta,
+                        "scroll_speed": 2
+                    })
                 else:
                     conversation_history = f"用户: {user_input}"
-                
-                client.send_message({
-                    "text": conversation_history,
-                    "scroll_speed": 2
-                })
-                
+                    client.send_message({
+                        "text": conversation_history,
+                        "scroll_speed": 2
+                    })
+
                 # 模拟AI回复
                 time.sleep(1)
                 ai_response = f"AI: 我收到了您的消息「{user_input}」，这是一个很有趣的话题！"
-                conversation_history += f"\n\nAI: {ai_response}"
-                
+                delta = f"\n\nAI: {ai_response}"
+                conversation_history += delta
+
                 client.send_message({
-                    "text": conversation_history,
+                    "text_append": delta,
                     "scroll_speed": 2
                 })
         
     except KeyboardInterrupt:
         print("\n[Interactive] 交互测试被中断")
     finally:
-        client.disconnect()
+        if own_client:
+            client.disconnect()
 
 def main():
     """主测试函数"""
@@ -325,11 +543,18 @@ def main():
         test_interactive_chat()
     elif choice == "4":
         print("\n开始综合测试...")
-        test_continuation_text()
-        time.sleep(2)
-        test_performance()
-        time.sleep(2)
-        test_interactive_chat()
+        # 三个子测试复用同一条连接：省去两次 TCP 握手/挥手，
+        # 也避免快速重跑时积累 TIME_WAIT 套接字
+        client = ScrollTestClient()
+        if client.connect():
+            try:
+                test_continuation_text(client)
+                time.sleep(2)
+                test_performance(client)
+                time.sleep(2)
+                test_interactive_chat(client)
+            finally:
+                client.disconnect()
     else:
         print("无效选择，运行基础测试...")
         test_continuation_text()